@@ -367,12 +367,15 @@ def call_backend_api(text: str) -> Dict[str, Any]:
     try:
         response = requests.post(
             f"{BACKEND_URL}/check",
-            json={"content": text},
+            # Ask the backend to answer (partially if need be) before our own timeout
+            json={"content": text, "deadline_ms": 25000},
             headers={"Content-Type": "application/json"},
             timeout=30
         )
         response.raise_for_status()
-        return response.json()
+        result = response.json()
+        result["server_timing"] = response.headers.get("Server-Timing", "")
+        return result
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to backend: {str(e)}")
         st.info(f"Make sure your backend is running at: {BACKEND_URL}")
@@ -421,6 +424,14 @@ def display_results(result: Dict[str, Any]):
     # Display scam warning if applicable
     if scam.get("is_suspicious"):
         st.warning("⚠️ Possible scam indicators detected")
+
+    if result.get("partial"):
+        st.info("⏱️ Some sources could not be checked in time; this result may be incomplete")
+
+    # Where the backend spent its time (Server-Timing: "stage;dur=ms, ...")
+    if result.get("server_timing"):
+        stages = [part.strip().split(";dur=", 1) for part in result["server_timing"].split(",") if ";dur=" in part]
+        st.caption(" · ".join(f"{name} {float(ms):.0f} ms" for name, ms in stages))
     
     # Display evidence if available
     if evidence:
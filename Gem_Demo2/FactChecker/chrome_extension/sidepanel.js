@@ -228,7 +228,10 @@ class GemSidePanel {
     }
 
     const result = await response.json();
+    // Per-stage backend timings, e.g. "search;dur=1.2, fetch;dur=830.4, model;dur=2100.0"
+    result.serverTiming = response.headers.get("Server-Timing") || "";
     console.log("MCP server response:", result);
+    console.log("Server timing:", result.serverTiming);
     console.log("Sources in response:", result?.sources);
     console.log("Sources length:", result?.sources?.length);
 
@@ -293,6 +296,7 @@ class GemSidePanel {
     const evidence = analysis?.evidence || [];
     const sources = result?.sources || [];
     const scam = result?.scam?.is_suspicious;
+    const serverTiming = result?.serverTiming || "";
 
     // Debug: Log the full result and sources
     console.log("Full API result:", result);
@@ -310,6 +314,7 @@ class GemSidePanel {
       evidence,
       sources,
       scam,
+      serverTiming,
     });
 
     // Scroll to results section to make it visible
@@ -325,7 +330,15 @@ class GemSidePanel {
     }, 100);
   }
 
-  renderResults({ label, explanation, confidence, evidence, sources, scam }) {
+  renderResults({
+    label,
+    explanation,
+    confidence,
+    evidence,
+    sources,
+    scam,
+    serverTiming,
+  }) {
     const confPercent = Math.round(confidence * 100);
     const verdictClass = this.getVerdictClass(label);
     const verdictLabel = this.getVerdictLabel(label);
@@ -335,6 +348,7 @@ class GemSidePanel {
       evidence.length > 0 ? this.renderEvidence(evidence) : "";
     const sourcesHtml = sources.length > 0 ? this.renderSources(sources) : "";
     const scamWarning = scam ? this.renderScamWarning() : "";
+    const serverTimingHtml = this.renderServerTiming(serverTiming);
     const actionButtonsHtml = this.renderActionButtons();
     const sourceLinksHtml = this.renderSourceLinks(sources);
 
@@ -356,6 +370,8 @@ class GemSidePanel {
       
       ${scamWarning}
       
+      ${serverTimingHtml}
+      
       ${evidenceHtml}
       
       ${sourcesHtml}
@@ -411,6 +427,20 @@ class GemSidePanel {
     `;
   }
 
+  renderServerTiming(serverTiming) {
+    // Where the backend spent its time ("stage;dur=ms, ..."), as in app.py
+    const stages = (serverTiming || "")
+      .split(",")
+      .filter((part) => part.includes(";dur="))
+      .map((part) => {
+        const [name, ms] = part.trim().split(";dur=");
+        return `${name} ${Math.round(parseFloat(ms))} ms`;
+      });
+    if (stages.length === 0) return "";
+
+    return `<div class="server-timing">${stages.join(" · ")}</div>`;
+  }
+
   renderEvidence(evidence) {
     if (evidence.length === 0) return "";
 
@@ -1,18 +1,50 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import os
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
+from capture import CAPTURE
+from deadline import Deadline
+from feedback_store import FEEDBACK, FeedbackQueueFull
 from gemini_client import GeminiClient
-from mcp_server import fetch_url, search, detect_scam
+from http_client import aclose_async_client
+from link_index import LINK_INDEX
+from metrics import HTTP_IN_FLIGHT, REGISTRY, collect_timings, server_timing, timed
+from page_cache import PAGE_CACHE
+from parse_pool import PARSE_POOL
+from pipeline import CheckPipeline
+from rate_limit import RateLimitTimeout
+from settings import BATCH_CONCURRENCY, MAX_CONCURRENCY
+from startup import PREWARM, Startup
+from store import STORE
+from verdict_cache import VERDICT_CACHE
+
+# Also serve the MCP tools (streamable HTTP, at /mcp) from this process, so
+# they share its connection pool, caches, rate limiter and coalescing.
+# Off by default: the MCP SDK adds most of a second to startup.
+MCP_HTTP = os.getenv("FACTMCP_MCP_HTTP", "0") not in ("0", "false", "no")
 
 
 class CheckRequest(BaseModel):
     content: str
     language_hint: Optional[str] = None
+    # Answer within this many milliseconds; defaults to FACTMCP_DEADLINE_MS
+    deadline_ms: Optional[int] = Field(default=None, ge=100, le=120_000)
+
+
+class BatchCheckRequest(BaseModel):
+    claims: List[str] = Field(min_length=1, max_length=1000)
+    language_hint: Optional[str] = None
+    concurrency: int = Field(default=BATCH_CONCURRENCY, ge=1, le=MAX_CONCURRENCY)
 
 
 class FeedbackRequest(BaseModel):
@@ -22,38 +54,253 @@ class FeedbackRequest(BaseModel):
     notes: Optional[str] = None
 
 
-def create_app(gemini_api_key: str) -> FastAPI:
-    app = FastAPI(title="FactCheckMCP API")
+class _CountInFlight:
+    """ASGI middleware keeping HTTP_IN_FLIGHT up to date.
+
+    A request counts until the app has sent the last of its body, so a
+    streamed response (/check/stream, /check/batch) is in flight for as
+    long as it streams, not just until its headers are out.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+
+
+def _register_metrics(pipeline: CheckPipeline, gemini: GeminiClient, startup: Startup) -> None:
+    """Expose the caches', coalescer's, model client's and warm-up's stats on /metrics."""
+
+    def page_hit_ratio() -> float:
+        st = PAGE_CACHE.stats()
+        lookups = st["hits"] + st["misses"]
+        return st["hits"] / lookups if lookups else 0.0
+
+    REGISTRY.callback(
+        "factcheck_page_cache_requests_total",
+        "Source page cache lookups, by result.",
+        "counter",
+        lambda: {k: PAGE_CACHE.stats()[k] for k in ("hits", "misses", "not_modified")},
+        label="result",
+    )
+    REGISTRY.callback(
+        "factcheck_page_cache_hit_ratio",
+        "Share of page lookups served from the cache.",
+        "gauge",
+        page_hit_ratio,
+    )
+    REGISTRY.callback(
+        "factcheck_verdict_cache_requests_total",
+        "Verdict cache lookups, by result.",
+        "counter",
+        lambda: {k: VERDICT_CACHE.stats()[k] for k in ("exact_hits", "near_hits", "misses")},
+        label="result",
+    )
+    REGISTRY.callback(
+        "factcheck_verdict_cache_hit_ratio",
+        "Share of checks answered from the verdict cache.",
+        "gauge",
+        lambda: VERDICT_CACHE.stats()["hit_ratio"],
+    )
+    REGISTRY.callback(
+        "factcheck_store_lookups_total",
+        "Persistent store lookups after an in-memory miss, by result.",
+        "counter",
+        lambda: {"hit": STORE.hits, "miss": STORE.reads - STORE.hits},
+        label="result",
+    )
+    REGISTRY.callback(
+        "factcheck_checks_in_flight",
+        "Distinct checks currently running (after coalescing).",
+        "gauge",
+        lambda: pipeline.inflight.stats()["in_flight"],
+    )
+    REGISTRY.callback(
+        "factcheck_model_queue_waiting",
+        "Model calls waiting for rate-limit capacity.",
+        "gauge",
+        lambda: gemini.limiter.waiting,
+    )
+    REGISTRY.callback(
+        "factcheck_model_tokens_total",
+        "Model tokens used, by kind.",
+        "counter",
+        lambda: {k: gemini.usage.stats()[f"{k}_tokens"] for k in ("prompt", "output")},
+        label="kind",
+    )
+    REGISTRY.callback(
+        "factcheck_ready",
+        "1 once the startup warm-up has finished, else 0.",
+        "gauge",
+        lambda: float(startup.ready),
+    )
+    REGISTRY.callback(
+        "factcheck_time_to_ready_seconds",
+        "Seconds from application start until the warm-up finished.",
+        "gauge",
+        lambda: startup.ready_after or 0.0,
+    )
+    REGISTRY.callback(
+        "factcheck_feedback_queue_depth",
+        "Feedback records accepted but not yet written.",
+        "gauge",
+        lambda: FEEDBACK.depth,
+    )
+    REGISTRY.callback(
+        "factcheck_feedback_records_total",
+        "Feedback records, by outcome.",
+        "counter",
+        lambda: {k: getattr(FEEDBACK, k) for k in ("accepted", "rejected", "written", "lost")},
+        label="outcome",
+    )
+
+
+def create_app(gemini_api_key: str, gemini: Optional[GeminiClient] = None) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Uptime and time-to-ready count from when the server starts the app
+        startup.started = time.monotonic()
+        # Keep the trusted-source link index warm so searches never crawl inline
+        refresher = asyncio.create_task(LINK_INDEX.run_forever())
+        # Serve /healthz at once; /readyz waits for the warm-up
+        warmup = asyncio.create_task(startup.run()) if PREWARM else startup.skip()
+        async with AsyncExitStack() as stack:
+            if MCP_HTTP:
+                import mcp_server
+
+                await stack.enter_async_context(mcp_server.mcp.session_manager.run())
+            yield
+        if warmup is not None:
+            warmup.cancel()
+        refresher.cancel()
+        await aclose_async_client()
+        await asyncio.to_thread(CAPTURE.close)
+        await asyncio.to_thread(FEEDBACK.close)
+        await asyncio.to_thread(STORE.flush)
+        await asyncio.to_thread(PARSE_POOL.shutdown)
+
+    app = FastAPI(title="FactCheckMCP API", lifespan=lifespan)
     # Enable CORS for extension/local dev
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing"],
     )
     
-    gemini = GeminiClient(api_key=gemini_api_key)
+    gemini = gemini or GeminiClient(api_key=gemini_api_key)
+    pipeline = CheckPipeline(gemini)
+    startup = Startup(gemini)
+    app.state.startup = startup
+    _register_metrics(pipeline, gemini, startup)
+
+    app.add_middleware(_CountInFlight)
+
+    @app.exception_handler(RateLimitTimeout)
+    async def rate_limited(request: Request, exc: RateLimitTimeout) -> JSONResponse:
+        # Model quota exhausted for longer than the request was willing to wait
+        return JSONResponse(
+            {"detail": str(exc)},
+            status_code=503,
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
 
     @app.post("/check")
-    def check(req: CheckRequest) -> Dict[str, Any]:
-        # Simple flow: search → fetch top N → analyze
-        hits = search(req.content, limit=4)
-        fetched: List[Dict[str, Any]] = []
-        for h in hits:
+    async def check(req: CheckRequest, response: Response) -> Dict[str, Any]:
+        # Flow: search → fetch top N concurrently (+ scam heuristics) → analyze
+        with collect_timings() as timings, CAPTURE.check(req.content, req.language_hint, req.deadline_ms):
+            with timed("total"):
+                result = await pipeline.run(
+                    req.content, req.language_hint, Deadline.from_ms(req.deadline_ms)
+                )
+        # Per-stage breakdown for the side panel / Streamlit app (browser devtools show it too)
+        response.headers["Server-Timing"] = server_timing(timings)
+        return result
+
+    @app.post("/check/stream")
+    async def check_stream(req: CheckRequest) -> StreamingResponse:
+        # Server-Sent Events: scam → hits → source* → result (same schema as /check)
+        deadline = Deadline.from_ms(req.deadline_ms)
+
+        async def events() -> AsyncIterator[str]:
             try:
-                fetched.append(fetch_url(h["url"]))
-            except Exception:
-                continue
+                with CAPTURE.check(req.content, req.language_hint, req.deadline_ms):
+                    async for event, data in pipeline.stream(req.content, req.language_hint, deadline):
+                        yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            except Exception as exc:
+                yield f"event: error\ndata: {json.dumps({'detail': str(exc)})}\n\n"
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post("/check/batch")
+    async def check_batch(req: BatchCheckRequest) -> StreamingResponse:
+        # One NDJSON line per claim, in completion order; `index` maps back to the request
+        async def lines() -> AsyncIterator[str]:
+            async for result in pipeline.run_batch(req.claims, req.language_hint, req.concurrency):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/healthz")
+    async def healthz() -> Dict[str, Any]:
+        # Liveness: the process is up and serving, warm or not
+        return {"status": "ok", "uptime_seconds": round(time.monotonic() - startup.started, 3)}
 
-        scam = detect_scam(req.content)
-        analysis = gemini.analyze_content(req.content, fetched, req.language_hint)
-        # Include sources in response for UI display
-        return {"analysis": analysis, "scam": scam, "sources": fetched or hits}
+    @app.get("/readyz")
+    async def readyz() -> JSONResponse:
+        # Readiness: only route traffic here once the warm-up is done
+        body = startup.stats()
+        return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+    @app.get("/stats")
+    def stats() -> Dict[str, Any]:
+        return {
+            "link_index": LINK_INDEX.stats(),
+            "page_cache": PAGE_CACHE.stats(),
+            "parse_pool": PARSE_POOL.stats(),
+            "verdict_cache": VERDICT_CACHE.stats(),
+            "store": STORE.stats(),
+            "inflight": pipeline.inflight.stats(),
+            "usage": gemini.usage.stats(),
+            "rate_limit": gemini.limiter.stats(),
+            "capture": CAPTURE.stats(),
+            "feedback": FEEDBACK.stats(),
+        }
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics() -> PlainTextResponse:
+        # Prometheus text exposition format
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
     @app.post("/feedback")
-    def feedback(req: FeedbackRequest) -> Dict[str, Any]:
-        # Placeholder: in production, write to durable store (BigQuery/Firestore)
-        return {"status": "ok"}
+    async def feedback(req: FeedbackRequest) -> Any:
+        # Queued only; the writer thread batches records to disk (see feedback_store)
+        try:
+            record_id = FEEDBACK.submit(req.model_dump())
+        except FeedbackQueueFull as exc:
+            return JSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": "1"})
+        return {"status": "ok", "id": record_id}
+
+    if MCP_HTTP:
+        # Imported only when enabled, see MCP_HTTP. FastMCP's default transport
+        # security accepts localhost Host headers only.
+        import mcp_server
+
+        mcp_server.set_pipeline(pipeline)
+        app.router.routes.extend(mcp_server.mcp.streamable_http_app().routes)
 
     return app
 
@@ -0,0 +1,137 @@
+"""Microbenchmark: page text extraction size and cost.
+
+Compares the original BeautifulSoup heuristic (every article/p/li element's
+text, so nested blocks are read more than once) with extract.extract_page
+on the same pages: parse time, characters of text produced, and how much
+of that text is repeated sentences.
+
+    python benchmarks/bench_extract.py [--corpus benchmarks/corpus] [--synthetic 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+MAX_CHARS = 40000
+
+_WORDS = (
+    "government ministry scheme claim fact check video viral fake official report "
+    "health vaccine rainfall flood minister election announced citizens message"
+).split()
+
+
+def legacy_extract(html: bytes, url: str, max_chars: int) -> dict:
+    """The extraction fetch_url used before the streaming parser."""
+    soup = BeautifulSoup(html.decode("utf-8", "replace"), "html.parser")
+    title = extract._clean_text(soup.title.get_text()) if soup.title else url
+    paragraphs = [extract._clean_text(p.get_text(" ")) for p in soup.find_all(["article", "p", "li"])]
+    text = extract._clean_text(" ".join(p for p in paragraphs if p))[:max_chars]
+    return {"url": url, "title": title, "text": text}
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choices(_WORDS, k=rng.randint(8, 20))).capitalize() + "."
+
+
+def synthetic_page(seed: int) -> bytes:
+    """A news-style page: menus, an article with nested lists, share bars and a footer."""
+    rng = random.Random(seed)
+    links = "".join(f'<li><a href="/s/{i}">{_sentence(rng)[:40]}</a></li>' for i in range(30))
+    share = '<div class="share-bar"><a href="#">Share</a> <a href="#">Tweet</a> <a href="#">Email</a></div>'
+    body = []
+    for _ in range(rng.randint(8, 16)):
+        body.append(f"<p>{' '.join(_sentence(rng) for _ in range(3))}</p>")
+        if rng.random() < 0.3:
+            items = "".join(f"<li><p>{_sentence(rng)}</p></li>" for _ in range(4))
+            body.append(f"<ul>{items}</ul>")
+    body.insert(len(body) // 2, body[0])  # pull quote repeating the lede
+    return (
+        f"<html><head><title>{_sentence(rng)}</title><script>var x = 1;</script></head><body>"
+        f"<header><nav><ul>{links}</ul></nav></header>"
+        f"<article><h1>{_sentence(rng)}</h1>{share}{''.join(body)}{share}</article>"
+        f'<aside class="sidebar"><ul>{links}</ul></aside>'
+        f"<footer><ul>{links}</ul><p>{_sentence(rng)}</p></footer></body></html>"
+    ).encode("utf-8")
+
+
+def _redundancy(text: str) -> float:
+    """Fraction of sentence characters that repeat an earlier sentence."""
+    seen: set = set()
+    total = repeated = 0
+    for sentence in re.split(r"(?<=[.!?।])\s+|\n", text):
+        sentence = sentence.strip().casefold()
+        if not sentence:
+            continue
+        total += len(sentence)
+        if sentence in seen:
+            repeated += len(sentence)
+        seen.add(sentence)
+    return repeated / total if total else 0.0
+
+
+def _run(name: str, fn, pages: list, repeat: int) -> None:
+    chars = redundant = 0.0
+    for html in pages:
+        text = fn(html, "https://example.org/", MAX_CHARS)["text"]
+        chars += len(text)
+        redundant += _redundancy(text) * len(text)
+    elapsed = timeit.timeit(
+        lambda: [fn(html, "https://example.org/", MAX_CHARS) for html in pages], number=repeat
+    )
+    per_page_ms = elapsed / repeat / len(pages) * 1000
+    share = redundant / chars if chars else 0.0
+    print(f"{name:<16} {per_page_ms:>10.2f} {chars / len(pages):>12.0f} {share:>11.1%}")
+
+
+def _with_backend(use_lxml: bool):
+    def run(html: bytes, url: str, max_chars: int) -> dict:
+        saved = extract.etree
+        if not use_lxml:
+            extract.etree = None
+        try:
+            return extract.extract_page(html, url, max_chars)
+        finally:
+            extract.etree = saved
+
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR, help="directory of saved .html pages")
+    parser.add_argument("--synthetic", type=int, default=20, help="number of generated pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    suites = {}
+    if args.corpus.is_dir():
+        files = sorted(args.corpus.glob("*.html"))
+        if files:
+            suites[f"corpus ({len(files)} pages)"] = [f.read_bytes() for f in files]
+    if args.synthetic:
+        suites[f"synthetic ({args.synthetic} pages)"] = [synthetic_page(i) for i in range(args.synthetic)]
+
+    extractors = [("bs4 legacy", legacy_extract), ("extract stdlib", _with_backend(False))]
+    if extract.etree is not None:
+        extractors.append(("extract lxml", _with_backend(True)))
+
+    for suite, pages in suites.items():
+        print(f"\n{suite}")
+        print(f"{'extractor':<16} {'ms/page':>10} {'chars/page':>12} {'redundant':>11}")
+        for name, fn in extractors:
+            _run(name, fn, pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Burst benchmark for /feedback and the write-behind feedback store.
+
+Posts a burst of feedback records to the API in-process (over ASGI, so
+the numbers are the handler's cost, not the network's) from many
+concurrent clients, and reports request latency percentiles, accepted
+records/s and how long the writer needed to get everything on disk. The
+same burst against /healthz first gives the framework's own floor, which
+/feedback should stay close to.
+
+    python benchmarks/bench_feedback.py [--records 20000] [--concurrency 64]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+async def _run(args) -> None:
+    from api import create_app
+    from feedback_store import FEEDBACK
+
+    app = create_app("offline-benchmark")
+    statuses: dict = {}
+
+    async def burst(client: httpx.AsyncClient, path: str) -> List[float]:
+        latencies: List[float] = []
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(args.records):
+            queue.put_nowait(i)
+
+        async def client_loop() -> None:
+            while not queue.empty():
+                i = queue.get_nowait()
+                t0 = time.perf_counter()
+                if path == "/feedback":
+                    body = {"content": f"Claim number {i} about a viral video", "label": "misleading", "helpful": i % 3 != 0}
+                    r = await client.post(path, json=body)
+                    statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+                else:
+                    await client.get(path)
+                latencies.append(time.perf_counter() - t0)
+
+        await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+        return sorted(latencies)
+
+    def row(name: str, latencies: List[float], elapsed: float) -> None:
+        print(f"{name:<10} {statistics.median(latencies) * 1000:>8.2f} "
+              f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:>8.2f} {len(latencies) / elapsed:>10,.0f}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{args.records} requests per endpoint, {args.concurrency} clients\n")
+        print(f"{'endpoint':<10} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>10}")
+        started = time.perf_counter()
+        row("/healthz", await burst(client, "/healthz"), time.perf_counter() - started)
+        started = time.perf_counter()
+        latencies = await burst(client, "/feedback")
+        elapsed = time.perf_counter() - started
+        depth = FEEDBACK.depth
+        row("/feedback", latencies, elapsed)
+        await asyncio.to_thread(FEEDBACK.close)
+        drained = time.perf_counter() - started
+
+    st = FEEDBACK.stats()
+    print(f"\nstatuses {statuses}, queue depth at end of burst {depth}")
+    print(f"on disk      {st['written']} records in {st['batches']} batches, {st['segments']} segments, "
+          f"all written after {drained:.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        # Settings are read at import, so set them before the API is imported
+        os.environ["FACTMCP_FEEDBACK_DIR"] = directory
+        os.environ.setdefault("FACTMCP_FEEDBACK_QUEUE_SIZE", str(args.records))
+        os.environ["FACTMCP_STORE_PATH"] = ""
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Microbenchmark: HTML parse throughput inline, on threads and on the parse pool.
+
+Extracts a batch of large pages (heavy navigation and comment sections
+around the article, a few hundred KB each) concurrently, first inline on
+the event loop, then on a thread pool, then on parse_pool.ParsePool with
+an increasing number of worker processes, and reports pages/s and MB/s
+for each. Threads do not help because parsing holds the GIL; the process
+pool should scale with the number of cores until it runs out of them.
+
+    python benchmarks/bench_parse.py [--pages 48] [--workers 1,2,4,8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_extract import _sentence, synthetic_page  # noqa: E402
+from extract import extract_page  # noqa: E402
+from parse_pool import ParsePool  # noqa: E402
+
+MAX_CHARS = 40000
+
+
+def large_page(seed: int, comments: int = 600) -> bytes:
+    """A synthetic article followed by a long comment thread."""
+    rng = random.Random(seed)
+    thread = "".join(
+        f'<div class="comment"><a href="/u/{i}">user{i}</a><p>{_sentence(rng)} {_sentence(rng)}</p></div>'
+        for i in range(comments)
+    )
+    page = synthetic_page(seed)
+    return page.replace(b"</body>", f'<section class="comments">{thread}</section></body>'.encode("utf-8"))
+
+
+def _report(name: str, pages: List[bytes], elapsed: float) -> None:
+    megabytes = sum(map(len, pages)) / 1e6
+    print(f"{name:<18} {len(pages) / elapsed:>9.1f} {megabytes / elapsed:>8.2f}")
+
+
+async def _inline(pages: List[bytes]) -> None:
+    for i, page in enumerate(pages):
+        extract_page(page, f"https://example.org/{i}", MAX_CHARS)
+
+
+async def _threads(pages: List[bytes], workers: int) -> None:
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(workers) as executor:
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, extract_page, page, f"https://example.org/{i}", MAX_CHARS)
+                for i, page in enumerate(pages)
+            )
+        )
+
+
+async def _pool(pages: List[bytes], pool: ParsePool) -> None:
+    await asyncio.gather(*(pool.extract(page, f"https://example.org/{i}", MAX_CHARS) for i, page in enumerate(pages)))
+
+
+async def _run(args) -> None:
+    pages = [large_page(seed) for seed in range(args.pages)]
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1024:.0f} KB each, "
+          f"{os.cpu_count()} cores\n")
+    print(f"{'mode':<18} {'pages/s':>9} {'MB/s':>8}")
+
+    started = time.perf_counter()
+    await _inline(pages)
+    _report("inline", pages, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await _threads(pages, max(args.workers))
+    _report(f"{max(args.workers)} threads", pages, time.perf_counter() - started)
+
+    for workers in args.workers:
+        pool = ParsePool(workers=workers, inline_bytes=0)
+        # Start the workers before timing: spawning is a one-off cost at startup
+        await _pool(pages[:workers], pool)
+        started = time.perf_counter()
+        await _pool(pages, pool)
+        _report(f"pool, {workers} workers", pages, time.perf_counter() - started)
+        pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=48)
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1) * 2))
+    args = parser.parse_args()
+    args.workers = [int(w) for w in args.workers.split(",")]
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Microbenchmark: scam scan cost as the rule count grows.
+
+Compares the compiled ScamEngine against the previous approach of one
+re.search per pattern, on the same message, for synthetic rule sets of
+increasing size. The engine's per-scan time should stay roughly flat.
+
+    python benchmarks/bench_scam_engine.py [--sizes 10,100,1000,10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import string
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scam_engine import SCAM_RULES_PATH, ScamEngine  # noqa: E402
+
+MESSAGE = (
+    "Dear customer, your SBI account will be blocked today. Update KYC immediately "
+    "by clicking bit.ly/sbi-kyc and share the OTP received on your mobile. "
+    "बधाई हो आपने लॉटरी जीती है! Pay the processing fee to claim@ybl within 24 hours. "
+) * 4
+
+
+def _synthetic_phrases(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(2000)]
+    return [" ".join(rng.choices(words, k=rng.randint(1, 4))) for _ in range(n)]
+
+
+def _shipped_rules() -> list[dict]:
+    with open(SCAM_RULES_PATH, encoding="utf-8") as fh:
+        return json.load(fh)["rules"]
+
+
+def _rules(n: int) -> list[dict]:
+    real = _shipped_rules()
+    extra = [
+        {"id": f"synthetic.{i}", "category": "synthetic", "weight": 0.1, "phrases": [p]}
+        for i, p in enumerate(_synthetic_phrases(max(0, n - len(real))))
+    ]
+    return real + extra
+
+
+def _naive(rules: list[dict]):
+    patterns = []
+    for r in rules:
+        patterns += [re.escape(p).replace(r"\ ", r"\s*") for p in r.get("phrases", ())]
+        if r.get("regex"):
+            patterns.append(r["regex"])
+
+    def scan(text: str) -> list[str]:
+        return [p for p in patterns if re.search(p, text, re.IGNORECASE)]
+
+    return scan, len(patterns)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"message: {len(MESSAGE)} chars")
+    print(f"{'rules':>8} {'patterns':>9} {'compile ms':>11} {'engine µs/scan':>15} {'re.search µs/scan':>18}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        rules = _rules(size)
+        start = timeit.default_timer()
+        engine = ScamEngine(rules)
+        compile_ms = (timeit.default_timer() - start) * 1000
+        naive, n_patterns = _naive(rules)
+        engine_us = timeit.timeit(lambda: engine.scan(MESSAGE), number=args.repeat) / args.repeat * 1e6
+        naive_us = timeit.timeit(lambda: naive(MESSAGE), number=args.repeat) / args.repeat * 1e6
+        print(f"{len(rules):>8} {n_patterns:>9} {compile_ms:>11.1f} {engine_us:>15.0f} {naive_us:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
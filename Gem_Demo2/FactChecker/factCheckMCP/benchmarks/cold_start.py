@@ -0,0 +1,108 @@
+"""Cold-start benchmark: time to live, time to ready and first-check latency.
+
+Starts the API in a fresh Python process (with the fake trusted sites and
+the offline model in cold-start mode, so the first model call pays the
+SDK import and connection setup) and measures, from the moment the
+process is spawned:
+
+  live     /healthz answers
+  ready    /readyz answers 200 (the warm-up has finished)
+  first    latency of the first /check sent once ready
+  second   latency of the next, different /check
+
+once with the startup warm-up (FACTMCP_PREWARM=1) and once without, so
+the scale-from-zero penalty shows up as the difference in `first`.
+
+    python benchmarks/cold_start.py [--runs 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+HERE = Path(__file__).resolve().parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait(client: httpx.Client, path: str, started: float, timeout: float = 120.0) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            if client.get(path, timeout=1.0).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{path} not ready after {timeout}s")
+
+
+def _measure(prewarm: bool) -> Dict[str, float]:
+    port = _free_port()
+    env = dict(os.environ, FACTMCP_PREWARM="1" if prewarm else "0", FACTMCP_STORE_PATH="")
+    started = time.perf_counter()
+    child = subprocess.Popen([sys.executable, str(HERE / "cold_start.py"), "--serve", str(port)], env=env)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60.0) as client:
+            row = {"live": _wait(client, "/healthz", started), "ready": _wait(client, "/readyz", started)}
+            for name, claim in (("first", "Government scheme claim video viral"), ("second", "Health ministry vaccine report")):
+                t0 = time.perf_counter()
+                client.post("/check", json={"content": claim}).raise_for_status()
+                row[name] = time.perf_counter() - t0
+        return row
+    finally:
+        child.terminate()
+        child.wait(timeout=10)
+
+
+def _serve(port: int) -> None:
+    sys.path.insert(0, str(HERE.parent))
+    sys.path.insert(0, str(HERE))
+    import uvicorn
+
+    from fake_sites import Latency, ServerThread, create_sites_app, site_urls
+
+    sites = ServerThread(create_sites_app(8, Latency(80, 40, 0.0, 0.0, 0.0)))
+    os.environ["FACTMCP_TRUSTED_SOURCES"] = ",".join(site_urls(sites.start(), 8))
+
+    from api import create_app
+    from fake_gemini import FakeModel
+    from gemini_client import GeminiClient
+
+    model = FakeModel(800.0, 0.0, 0.0, 0.0, cold_start=True, connect_ms=300.0)
+    app = create_app("offline-benchmark", gemini=GeminiClient("offline-benchmark", model=model))
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        _serve(args.serve)
+        return
+
+    print(f"{'prewarm':<8} {'live s':>7} {'ready s':>8} {'first ms':>9} {'second ms':>10}   (median of {args.runs})")
+    for prewarm in (False, True):
+        rows: List[Dict[str, float]] = [_measure(prewarm) for _ in range(args.runs)]
+        med = {k: statistics.median(r[k] for r in rows) for k in rows[0]}
+        print(f"{'on' if prewarm else 'off':<8} {med['live']:>7.2f} {med['ready']:>8.2f} "
+              f"{med['first'] * 1000:>9.0f} {med['second'] * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Offline stand-in for the Gemini model, for benchmarks.
+
+FakeModel implements the two calls GeminiClient makes (generate_content
+and generate_content_async) with a configurable latency, slow tail and
+429 rate, and answers with a well-formed verdict that quotes the first
+passage it was sent. Pass it as GeminiClient(model=FakeModel(...)).
+
+With `cold_start` set, the first call (a check or the warm-up's token
+count) also pays what a fresh process pays for the real model: the SDK
+import and `connect_ms` of channel and TLS setup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from google.api_core.exceptions import ResourceExhausted
+
+from gemini_client import estimate_tokens
+
+
+@dataclass
+class _UsageMetadata:
+    prompt_token_count: int
+    candidates_token_count: int
+
+
+@dataclass
+class _Response:
+    text: str
+    usage_metadata: _UsageMetadata
+
+
+@dataclass
+class FakeModel:
+    latency_ms: float = 800.0
+    jitter_ms: float = 200.0
+    tail_prob: float = 0.02
+    tail_ms: float = 5000.0
+    throttle_rate: float = 0.0
+    seed: int = 2
+    cold_start: bool = False
+    connect_ms: float = 300.0
+    calls: int = 0
+    _rng: random.Random = field(init=False, repr=False)
+    _connecting: Optional["asyncio.Task[None]"] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    async def _open(self) -> None:
+        await asyncio.to_thread(importlib.import_module, "google.generativeai")
+        await asyncio.sleep(self.connect_ms / 1000.0)
+
+    async def _connect(self) -> None:
+        if self.cold_start:
+            if self._connecting is None:
+                self._connecting = asyncio.ensure_future(self._open())
+            await self._connecting
+
+    def _delay(self) -> float:
+        if self._rng.random() < self.tail_prob:
+            return self.tail_ms * self._rng.uniform(0.5, 1.5) / 1000.0
+        return max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+
+    def _respond(self, parts: List[str]) -> _Response:
+        self.calls += 1
+        if self._rng.random() < self.throttle_rate:
+            raise ResourceExhausted("fake quota exhausted")
+        prompt: Dict[str, Any] = json.loads(parts[0])
+        evidence = []
+        for source in prompt.get("sources", [])[:2]:
+            quote = (source.get("passages") or [source.get("snippet") or ""])[0][:200]
+            evidence.append({"url": source.get("url"), "quote": quote, "support": "supports"})
+        verdict = {
+            "label": "Verified" if evidence else "Suspicious",
+            "explanation": "Benchmark verdict from the offline model.",
+            "evidence": evidence,
+            "confidence": 0.7,
+        }
+        text = json.dumps(verdict)
+        return _Response(text, _UsageMetadata(estimate_tokens(parts[0]), estimate_tokens(text)))
+
+    async def count_tokens_async(self, parts: List[str]) -> int:
+        await self._connect()
+        return sum(estimate_tokens(p) for p in parts)
+
+    async def generate_content_async(self, parts: List[str], generation_config: Any = None) -> _Response:
+        await self._connect()
+        await asyncio.sleep(self._delay())
+        return self._respond(parts)
+
+    def generate_content(self, parts: List[str], generation_config: Any = None) -> _Response:
+        time.sleep(self._delay())
+        return self._respond(parts)
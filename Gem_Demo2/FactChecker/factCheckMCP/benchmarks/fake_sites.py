@@ -0,0 +1,150 @@
+"""Local stand-ins for the trusted sites, for offline benchmarks.
+
+Each site serves an index page of article links (what the link index
+crawls) and the articles themselves. Articles are the saved pages in
+benchmarks/corpus plus generated news-style pages, so extraction and
+passage ranking do realistic work. Every response is delayed by a
+configurable latency with an occasional slow tail, and a share of
+requests fail with 503.
+
+    python benchmarks/fake_sites.py --port 8900 --latency-ms 80 --tail-prob 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from html import escape
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse, Response
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_extract import CORPUS_DIR, synthetic_page  # noqa: E402
+
+
+@dataclass
+class Latency:
+    """Per-response delay: base ± jitter, and `tail_prob` of responses take `tail_ms`."""
+
+    base_ms: float = 80.0
+    jitter_ms: float = 40.0
+    tail_prob: float = 0.05
+    tail_ms: float = 2000.0
+    error_rate: float = 0.02
+
+    def sample(self, rng: random.Random) -> float:
+        if rng.random() < self.tail_prob:
+            return self.tail_ms * rng.uniform(0.5, 1.5) / 1000.0
+        return max(0.0, self.base_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+
+
+def load_articles(synthetic: int = 40) -> List[Tuple[str, bytes]]:
+    """(title, html) for every corpus page plus `synthetic` generated ones."""
+    articles: List[Tuple[str, bytes]] = []
+    pages = [p.read_bytes() for p in sorted(CORPUS_DIR.glob("*.html"))]
+    pages += [synthetic_page(i) for i in range(synthetic)]
+    for html in pages:
+        match = re.search(rb"<title>(.*?)</title>", html, re.S)
+        title = match.group(1).decode("utf-8", "replace").strip() if match else "Untitled article"
+        articles.append((title, html))
+    return articles
+
+
+def create_sites_app(
+    sites: int = 8, latency: Optional[Latency] = None, seed: int = 1, synthetic: int = 40
+) -> FastAPI:
+    latency = latency or Latency()
+    rng = random.Random(seed)
+    articles = load_articles(synthetic)
+    app = FastAPI(title="fake trusted sites")
+    app.state.requests = 0
+
+    def _article_ids(site: int) -> List[int]:
+        # Each site links a different, overlapping slice of the articles
+        return [(site * 7 + k) % len(articles) for k in range(max(1, len(articles) // 2))]
+
+    async def _delay() -> Optional[Response]:
+        app.state.requests += 1
+        await asyncio.sleep(latency.sample(rng))
+        if rng.random() < latency.error_rate:
+            return Response("unavailable", status_code=503)
+        return None
+
+    @app.get("/site{site}/")
+    async def index(site: int) -> Response:
+        failed = await _delay()
+        if failed is not None:
+            return failed
+        links = "".join(
+            f'<li><a href="/site{site}/a/{i}">{escape(articles[i][0])}</a></li>' for i in _article_ids(site)
+        )
+        return HTMLResponse(f"<html><head><title>Site {site}</title></head><body><ul>{links}</ul></body></html>")
+
+    @app.get("/site{site}/a/{article}")
+    async def article(site: int, article: int) -> Response:
+        failed = await _delay()
+        if failed is not None:
+            return failed
+        return HTMLResponse(articles[article % len(articles)][1])
+
+    app.state.sites = sites
+    app.state.articles = articles
+    return app
+
+
+def site_urls(base: str, sites: int) -> List[str]:
+    return [f"{base}/site{i}/" for i in range(sites)]
+
+
+class ServerThread:
+    """Run an ASGI app under uvicorn on a background thread (own event loop)."""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="on")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self) -> str:
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--sites", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--tail-prob", type=float, default=0.05)
+    parser.add_argument("--tail-ms", type=float, default=2000.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    latency = Latency(args.latency_ms, args.latency_ms / 2, args.tail_prob, args.tail_ms, args.error_rate)
+    app = create_sites_app(args.sites, latency)
+    base = f"http://127.0.0.1:{args.port}"
+    print("FACTMCP_TRUSTED_SOURCES=" + ",".join(site_urls(base, args.sites)))
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
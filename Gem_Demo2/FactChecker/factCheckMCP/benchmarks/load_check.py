@@ -0,0 +1,182 @@
+"""Offline load test: /check latency and throughput as concurrency grows.
+
+Starts the local trusted-site stand-ins (fake_sites.py) and the real
+api.create_app pipeline with the offline model (fake_gemini.py), each
+under uvicorn on its own thread, then drives POST /check at increasing
+concurrency and reports p50/p95/p99 latency, throughput, partial results
+and errors per level, followed by the mean time per pipeline stage from
+/metrics. Needs no network access or API key.
+
+    python benchmarks/load_check.py [--concurrency 1,4,16,64] [--requests 200]
+
+By default the verdict cache is disabled so every request runs the full
+pipeline; --verdict-cache with --repeat-ratio measures a cached mix.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _claims(titles: List[str], n: int, repeat_ratio: float, seed: int = 3) -> List[str]:
+    rng = random.Random(seed)
+    claims: List[str] = []
+    for i in range(n):
+        if claims and rng.random() < repeat_ratio:
+            claims.append(rng.choice(claims))
+        else:
+            # Title words (so search finds sources) plus a unique tail (so it is a new claim)
+            claims.append(f"{rng.choice(titles)} claim {i} {rng.randrange(10**9)}")
+    return claims
+
+
+async def _run_level(client, claims: List[str], concurrency: int, deadline_ms: int) -> Dict[str, float]:
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for claim in claims:
+        queue.put_nowait(claim)
+    latencies: List[float] = []
+    counts = {"ok": 0, "partial": 0, "errors": 0}
+
+    async def worker() -> None:
+        while not queue.empty():
+            claim = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                r = await client.post("/check", json={"content": claim, "deadline_ms": deadline_ms})
+                if r.status_code != 200:
+                    counts["errors"] += 1
+                    continue
+                counts["partial" if r.json().get("partial") else "ok"] += 1
+            except Exception:
+                counts["errors"] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        **counts,
+        "rps": len(claims) / elapsed,
+        "p50": _percentile(latencies, 0.50) * 1000,
+        "p95": _percentile(latencies, 0.95) * 1000,
+        "p99": _percentile(latencies, 0.99) * 1000,
+        "mean": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def _stage_means(metrics_text: str) -> List[Tuple[str, float, int]]:
+    sums: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    for line in metrics_text.splitlines():
+        m = re.match(r'factcheck_stage_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)', line)
+        if m:
+            (sums if m.group(1) == "sum" else counts)[m.group(2)] = float(m.group(3))
+    return [(stage, sums[stage] / counts[stage] * 1000, int(counts[stage])) for stage in sums if counts.get(stage)]
+
+
+async def _drive(args, api_base: str, titles: List[str]) -> None:
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(args.concurrency_levels) + 8)
+    async with httpx.AsyncClient(base_url=api_base, timeout=120.0, limits=limits) as client:
+        # Wait for the link index to be built from the fake sites
+        await client.post("/check", json={"content": titles[0] + " warmup", "deadline_ms": 60000})
+        print(f"{'conc':>5} {'reqs':>5} {'ok':>5} {'partial':>8} {'errors':>7} {'req/s':>7} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for level, concurrency in enumerate(args.concurrency_levels):
+            claims = _claims(titles, args.requests, args.repeat_ratio, seed=level)
+            row = await _run_level(client, claims, concurrency, args.deadline_ms)
+            print(f"{concurrency:>5} {args.requests:>5} {row['ok']:>5} {row['partial']:>8} {row['errors']:>7} "
+                  f"{row['rps']:>7.1f} {row['p50']:>8.0f} {row['p95']:>8.0f} {row['p99']:>8.0f}")
+        metrics_text = (await client.get("/metrics")).text
+    print("\nmean time per stage")
+    for stage, mean_ms, count in sorted(_stage_means(metrics_text), key=lambda s: -s[1]):
+        print(f"  {stage:<12} {mean_ms:>9.1f} ms  ({count} samples)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--deadline-ms", type=int, default=25000)
+    parser.add_argument("--sites", type=int, default=8)
+    parser.add_argument("--site-latency-ms", type=float, default=80.0)
+    parser.add_argument("--site-tail-prob", type=float, default=0.05)
+    parser.add_argument("--site-tail-ms", type=float, default=2000.0)
+    parser.add_argument("--site-error-rate", type=float, default=0.02)
+    parser.add_argument("--model-latency-ms", type=float, default=800.0)
+    parser.add_argument("--model-tail-prob", type=float, default=0.02)
+    parser.add_argument("--model-tail-ms", type=float, default=5000.0)
+    parser.add_argument("--model-throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=float, default=1e6, help="model requests/minute quota")
+    parser.add_argument("--verdict-cache", action="store_true", help="keep the verdict cache on")
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="share of repeated claims")
+    args = parser.parse_args()
+    args.concurrency_levels = [int(c) for c in args.concurrency.split(",")]
+
+    # Settings are read at import time, so configure before importing the app
+    os.environ.setdefault("FACTMCP_GEMINI_RPM", str(args.rpm))
+    if not args.verdict_cache:
+        os.environ["FACTMCP_VERDICT_CACHE_TTL"] = "0"
+    # Every run starts cold; the on-disk store would carry pages over between runs
+    os.environ["FACTMCP_STORE_PATH"] = ""
+
+    from fake_sites import Latency, ServerThread, create_sites_app, site_urls
+
+    latency = Latency(
+        args.site_latency_ms, args.site_latency_ms / 2, args.site_tail_prob, args.site_tail_ms,
+        args.site_error_rate,
+    )
+    sites_app = create_sites_app(args.sites, latency)
+    sites = ServerThread(sites_app)
+    sites_base = sites.start()
+    os.environ["FACTMCP_TRUSTED_SOURCES"] = ",".join(site_urls(sites_base, args.sites))
+
+    from api import create_app
+    from fake_gemini import FakeModel
+    from gemini_client import GeminiClient
+
+    # Keep per-request httpx logging (turned on by the MCP SDK when imported) out of the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    model = FakeModel(
+        args.model_latency_ms, args.model_latency_ms / 4, args.model_tail_prob, args.model_tail_ms,
+        args.model_throttle_rate,
+    )
+    app = create_app("offline-benchmark", gemini=GeminiClient("offline-benchmark", model=model))
+    api = ServerThread(app)
+    api_base = api.start()
+    print(f"sites: {args.sites} at {sites_base}, api at {api_base}")
+
+    titles = [title for title, _ in sites_app.state.articles]
+    try:
+        asyncio.run(_drive(args, api_base, titles))
+    finally:
+        api.stop()
+        sites.stop()
+    print(f"\nsite requests: {sites_app.state.requests}, model calls: {model.calls}")
+
+
+if __name__ == "__main__":
+    main()
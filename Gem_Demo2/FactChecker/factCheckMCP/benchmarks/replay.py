@@ -0,0 +1,325 @@
+"""Replay captured production traffic against a local build.
+
+Reads a capture written with FACTMCP_CAPTURE_SAMPLE / FACTMCP_CAPTURE_PATH
+(see capture.py) and re-issues its /check requests to api.create_app
+running on a local uvicorn thread. Every outbound call is answered from
+the capture: the shared HTTP client is pointed at a transport that serves
+the recorded responses for each URL, the trusted sources are the ones
+that were crawled, and the model is replaced by one that returns the
+recorded verdict for each prompt. Needs no network access or API key.
+
+    python benchmarks/replay.py data/capture.jsonl.gz [--speed 1] [--out run.jsonl]
+
+--speed 1 keeps the original request spacing and upstream latencies,
+--speed 10 compresses both tenfold and --speed 0 drops all delays and
+sends requests back to back with --concurrency in flight. With the same
+capture and code, two runs at --speed 0 return the same results; pass
+--compare with an earlier --out file to list checks whose label,
+sources or partial flag changed between builds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from capture import prompt_key, read_capture  # noqa: E402
+
+# Capture id of the check the app is currently serving, taken from _CHECK_HEADER
+_replaying: ContextVar[Optional[str]] = ContextVar("replaying", default=None)
+_CHECK_HEADER = b"x-replay-check"
+
+
+@dataclass
+class _UsageMetadata:
+    prompt_token_count: int
+    candidates_token_count: int
+
+
+@dataclass
+class _Response:
+    text: str
+    usage_metadata: _UsageMetadata
+
+
+class Capture:
+    """A capture file indexed for replay."""
+
+    def __init__(self, path: str) -> None:
+        self.checks: List[Dict[str, Any]] = []
+        self.http: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self.models_by_claim: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.crawled: List[str] = []
+        for record in read_capture(path):
+            kind = record["type"]
+            if kind == "check":
+                self.checks.append(record)
+            elif kind == "http":
+                self.http[(record["method"], record["url"])].append(record)
+                if record["crawl"] and record["url"] not in self.crawled:
+                    self.crawled.append(record["url"])
+            elif kind == "model":
+                self.models.setdefault(record["prompt_key"], record)
+                claim = (record["content"], record["language_hint"] or "auto")
+                self.models_by_claim.setdefault(claim, record)
+        self.checks.sort(key=lambda c: c["t"])
+
+
+def tag_checks(app):
+    """ASGI wrapper exposing each request's capture id to the replay transport."""
+
+    async def tagged(scope, receive, send):
+        if scope["type"] == "http":
+            check_id = dict(scope["headers"]).get(_CHECK_HEADER)
+            if check_id:
+                _replaying.set(check_id.decode("ascii"))
+        await app(scope, receive, send)
+
+    return tagged
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve recorded responses for each URL.
+
+    A request made while replaying a check gets the response recorded
+    for that check when there is one, so a page that failed for it
+    during capture fails again whatever the timing. Other requests (the
+    link-index crawl, pages fetched by another check in production) get
+    the URL's responses in turn. A conditional request is answered with
+    a recorded 304 when there is one, an unconditional one never is.
+    URLs missing from the capture fail like an unreachable host.
+    """
+
+    def __init__(self, capture: Capture, scale: float) -> None:
+        self.capture = capture
+        self.scale = scale
+        self.served = 0
+        self.misses = 0
+        self._turn: Dict[Tuple[Tuple[str, str], bool], int] = defaultdict(int)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = (request.method, str(request.url))
+        conditional = "if-none-match" in request.headers or "if-modified-since" in request.headers
+        records = self.capture.http.get(key, [])
+        candidates = [r for r in records if r["status"] == 304] if conditional else []
+        candidates = candidates or [r for r in records if r["status"] != 304]
+        if not candidates:
+            self.misses += 1
+            raise httpx.ConnectError(f"not in capture: {request.method} {request.url}", request=request)
+        own = [r for r in candidates if r["id"] is not None and r["id"] == _replaying.get()]
+        if own:
+            record = own[0]
+        else:
+            turn = self._turn[(key, conditional)]
+            self._turn[(key, conditional)] = turn + 1
+            record = candidates[turn % len(candidates)]
+        if self.scale:
+            await asyncio.sleep(record["elapsed"] * self.scale)
+        self.served += 1
+        # Only the bytes read at capture time were kept, so drop the framing headers
+        headers = [
+            (k, v) for k, v in record["headers"] if k.lower() not in ("content-length", "transfer-encoding")
+        ]
+        return httpx.Response(
+            record["status"], headers=headers, content=base64.b64decode(record["body_b64"]), request=request
+        )
+
+
+class ReplayModel:
+    """Model stand-in answering each prompt with its recorded response.
+
+    Prompts are matched exactly first; a prompt that differs (for example
+    because ranking changed in the build under test) falls back to the
+    recorded answer for the same claim.
+    """
+
+    def __init__(self, capture: Capture, scale: float) -> None:
+        self.capture = capture
+        self.scale = scale
+        self.calls = 0
+        self.exact = 0
+        self.by_claim = 0
+
+    def _record(self, prompt_text: str) -> Dict[str, Any]:
+        self.calls += 1
+        record = self.capture.models.get(prompt_key(prompt_text))
+        if record is not None:
+            self.exact += 1
+            return record
+        prompt = json.loads(prompt_text)
+        record = self.capture.models_by_claim.get((prompt.get("content"), prompt.get("language_hint") or "auto"))
+        if record is None:
+            raise LookupError("no recorded model response for this claim")
+        self.by_claim += 1
+        return record
+
+    @staticmethod
+    def _respond(record: Dict[str, Any]) -> _Response:
+        usage = record["usage"]
+        return _Response(record["text"], _UsageMetadata(usage["prompt_tokens"], usage["output_tokens"]))
+
+    async def generate_content_async(self, parts: List[str], generation_config: Any = None) -> _Response:
+        record = self._record(parts[0])
+        if self.scale:
+            await asyncio.sleep(record["elapsed"] * self.scale)
+        return self._respond(record)
+
+    def generate_content(self, parts: List[str], generation_config: Any = None) -> _Response:
+        record = self._record(parts[0])
+        if self.scale:
+            time.sleep(record["elapsed"] * self.scale)
+        return self._respond(record)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _summary(check: Dict[str, Any], status: int, body: Dict[str, Any], latency: float) -> Dict[str, Any]:
+    analysis = body.get("analysis") or {}
+    return {
+        "id": check["id"],
+        "status": status,
+        "label": analysis.get("label"),
+        "confidence": analysis.get("confidence"),
+        "sources": [s.get("url") for s in body.get("sources") or []],
+        "partial": body.get("partial"),
+        "incomplete": body.get("incomplete"),
+        "latency_ms": round(latency * 1000, 1),
+    }
+
+
+async def _replay(args, api_base: str, checks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    results: List[Optional[Dict[str, Any]]] = [None] * len(checks)
+    gate = asyncio.Semaphore(args.concurrency if not args.speed else len(checks) or 1)
+
+    async with httpx.AsyncClient(base_url=api_base, timeout=180.0) as client:
+        # The first search waits for the link index; build it before timing anything
+        while not (await client.get("/stats")).json()["link_index"]["refresh_count"]:
+            await asyncio.sleep(0.05)
+
+        async def send(i: int, check: Dict[str, Any]) -> None:
+            if args.speed:
+                await asyncio.sleep((check["t"] - checks[0]["t"]) / args.speed)
+            payload = {"content": check["content"], "language_hint": check["language_hint"]}
+            if check["deadline_ms"] is not None:
+                payload["deadline_ms"] = check["deadline_ms"]
+            async with gate:
+                started = time.perf_counter()
+                try:
+                    r = await client.post("/check", json=payload, headers={"X-Replay-Check": check["id"]})
+                    status, body = r.status_code, (r.json() if r.status_code == 200 else {})
+                except httpx.HTTPError:
+                    status, body = 0, {}
+                results[i] = _summary(check, status, body, time.perf_counter() - started)
+
+        await asyncio.gather(*(send(i, c) for i, c in enumerate(checks)))
+    return [r for r in results if r is not None]
+
+
+def _compare(results: List[Dict[str, Any]], path: str) -> None:
+    with open(path, encoding="utf-8") as fh:
+        before = {r["id"]: r for r in map(json.loads, fh)}
+    changed = 0
+    for r in results:
+        old = before.get(r["id"])
+        if old is None:
+            continue
+        diffs = [k for k in ("status", "label", "sources", "partial") if old.get(k) != r.get(k)]
+        if diffs:
+            changed += 1
+            print(f"  {r['id']}: " + ", ".join(f"{k} {old.get(k)!r} -> {r.get(k)!r}" for k in diffs))
+    print(f"{changed} of {len(results)} checks changed against {path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression; 0 = no delays")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight with --speed 0")
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N checks")
+    parser.add_argument("--out", help="write one JSON line per check")
+    parser.add_argument("--compare", help="earlier --out file to diff results against")
+    args = parser.parse_args()
+
+    capture = Capture(args.capture)
+    checks = capture.checks[: args.limit or None]
+    if not checks:
+        sys.exit(f"no checks in {args.capture}")
+    scale = 1.0 / args.speed if args.speed else 0.0
+
+    # Settings are read at import time, so configure before importing the app
+    os.environ["FACTMCP_CAPTURE_SAMPLE"] = "0"
+    # Start cold like the captured process did, whatever earlier runs stored
+    os.environ["FACTMCP_STORE_PATH"] = ""
+    # No page or verdict caching: each check is served its own recorded
+    # fetches and model call, whatever order the checks finish in here (a
+    # cached page would otherwise stand in for a fetch that failed)
+    os.environ["FACTMCP_PAGE_CACHE_MAX_BYTES"] = "0"
+    os.environ["FACTMCP_VERDICT_CACHE_TTL"] = "0"
+    os.environ["FACTMCP_TRUSTED_SOURCES"] = ",".join(capture.crawled)
+
+    from api import create_app
+    from fake_sites import ServerThread
+    from gemini_client import GeminiClient
+    from http_client import set_transport
+
+    # Keep per-request httpx logging (turned on by the MCP SDK when imported) out of the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    transport = ReplayTransport(capture, scale)
+    set_transport(transport)
+    model = ReplayModel(capture, scale)
+    app = create_app("replay", gemini=GeminiClient("replay", model=model))
+    api = ServerThread(tag_checks(app))
+    api_base = api.start()
+    print(f"replaying {len(checks)} checks from {args.capture} at speed {args.speed:g}")
+
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(_replay(args, api_base, checks))
+    finally:
+        api.stop()
+    elapsed = time.perf_counter() - started
+
+    latencies = [r["latency_ms"] for r in results if r["status"] == 200]
+    errors = sum(1 for r in results if r["status"] != 200)
+    partial = sum(1 for r in results if r["partial"])
+    print(f"{len(results)} checks in {elapsed:.1f}s: {errors} errors, {partial} partial")
+    if latencies:
+        print(f"latency ms  p50 {_percentile(latencies, 0.5):.0f}  p95 {_percentile(latencies, 0.95):.0f}  "
+              f"p99 {_percentile(latencies, 0.99):.0f}  mean {statistics.fmean(latencies):.0f}")
+    print(f"http served {transport.served}, not in capture {transport.misses}; "
+          f"model calls {model.calls} ({model.exact} exact prompt, {model.by_claim} by claim)")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            for r in results:
+                fh.write(json.dumps(r, ensure_ascii=False) + "\n")
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
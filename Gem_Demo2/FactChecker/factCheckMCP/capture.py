@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from settings import DATA_DIR
+
+# Opt-in traffic capture: share of /check requests recorded (0 disables)
+CAPTURE_SAMPLE = float(os.getenv("FACTMCP_CAPTURE_SAMPLE", "0"))
+CAPTURE_PATH = os.getenv("FACTMCP_CAPTURE_PATH", os.path.join(DATA_DIR, "capture.jsonl.gz"))
+# Recording stops once the file reaches this size
+CAPTURE_MAX_BYTES = int(os.getenv("FACTMCP_CAPTURE_MAX_BYTES", str(512 * 1024 * 1024)))
+CAPTURE_QUEUE_SIZE = int(os.getenv("FACTMCP_CAPTURE_QUEUE_SIZE", "10000"))
+
+_STOP = object()
+
+# Id of the sampled check the current task is serving, if any
+_current: ContextVar[Optional[str]] = ContextVar("factcheck_capture", default=None)
+
+
+def prompt_key(prompt_text: str) -> str:
+    return hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()
+
+
+class CaptureWriter:
+    """Append-only gzip JSON-lines capture of sampled checks and their I/O.
+
+    Record types:
+      check  {id, t, content, language_hint, deadline_ms}
+      http   {id, t, method, url, status, headers, body_b64, elapsed, crawl}
+      model  {id, t, prompt_key, content, language_hint, text, usage, elapsed}
+
+    `t` is wall-clock time, so a replay can reproduce the original pacing.
+    Records only go on a bounded in-memory queue; a background thread
+    encodes them and appends to the gzip file, flushing after each batch,
+    so the event loop never touches the disk. A file cut short by a crash
+    is readable up to its last complete record, and a restart appends a
+    new gzip member to the same file. When the queue is full, records are
+    dropped and counted rather than blocking the request.
+    """
+
+    def __init__(
+        self,
+        path: str = CAPTURE_PATH,
+        sample: float = CAPTURE_SAMPLE,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        queue_size: int = CAPTURE_QUEUE_SIZE,
+    ) -> None:
+        self.path = path
+        self.sample = sample
+        self.max_bytes = max_bytes
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._file: Optional[gzip.GzipFile] = None
+        self._raw = None
+        self.queued = 0
+        self.records = 0
+        self.dropped = 0
+        self.errors = 0
+        self.lost = 0
+        self.sampled = 0
+        self.full = False
+        # Body hash of the last recorded crawl per URL, to skip unchanged pages
+        self._crawled: Dict[str, str] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample > 0
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self.full:
+            return
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.queued += 1
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            with self._start_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="factcheck-capture", daemon=True)
+                    self._writer.start()
+                    atexit.register(self.close)
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Take whatever else is already queued without waiting
+            while batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+            if batch:
+                self._append(batch)
+            if stop:
+                self._close_file()
+                return
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        if self.full:
+            self.lost += len(records)
+            return
+        data = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        try:
+            if self._file is None:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                self._raw = open(self.path, "ab")
+                self._file = gzip.GzipFile(fileobj=self._raw, mode="ab")
+            self._file.write(data.encode("utf-8"))
+            self._file.flush()
+        except OSError:
+            # Keep the writer alive; the batch is lost but counted
+            self.errors += 1
+            self.lost += len(records)
+            self._close_file()
+            return
+        self.records += len(records)
+        if self._raw.tell() >= self.max_bytes:
+            self.full = True
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+                self._raw.close()
+            except OSError:
+                self.errors += 1
+            self._file = self._raw = None
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Wait until everything queued so far is written (best effort)."""
+        deadline = time.monotonic() + timeout
+        while self._writer is not None and self.records + self.lost < self.queued and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Write out everything queued and close the file."""
+        with self._start_lock:
+            writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        self._queue.put(_STOP)
+        writer.join(timeout)
+
+    @contextmanager
+    def check(
+        self, content: str, language_hint: Optional[str], deadline_ms: Optional[int]
+    ) -> Iterator[Optional[str]]:
+        """Sample one check; while inside, its outbound calls are recorded too."""
+        if not self.enabled or self.full or random.random() >= self.sample:
+            yield None
+            return
+        check_id = uuid.uuid4().hex[:16]
+        self.sampled += 1
+        self._write(
+            {
+                "type": "check",
+                "id": check_id,
+                "t": time.time(),
+                "content": content,
+                "language_hint": language_hint,
+                "deadline_ms": deadline_ms,
+            }
+        )
+        token = _current.set(check_id)
+        try:
+            yield check_id
+        finally:
+            _current.reset(token)
+
+    def record_http(
+        self, request: httpx.Request, response: httpx.Response, body: bytes, elapsed: float, crawl: bool
+    ) -> None:
+        check_id = _current.get()
+        if check_id is None and not crawl:
+            return
+        if crawl:
+            # The background crawler may run inside a sampled check's context
+            digest = hashlib.sha1(body).hexdigest()
+            if self._crawled.get(str(request.url)) == digest:
+                return
+            self._crawled[str(request.url)] = digest
+        self._write(
+            {
+                "type": "http",
+                "id": check_id,
+                "t": time.time(),
+                "method": request.method,
+                "url": str(request.url),
+                "conditional": "if-none-match" in request.headers or "if-modified-since" in request.headers,
+                "status": response.status_code,
+                "headers": response.headers.multi_items(),
+                "body_b64": base64.b64encode(body).decode("ascii"),
+                "elapsed": round(elapsed, 4),
+                "crawl": crawl,
+            }
+        )
+
+    def record_model(
+        self,
+        prompt_text: str,
+        content: str,
+        language_hint: Optional[str],
+        text: str,
+        usage: Dict[str, int],
+        elapsed: float,
+    ) -> None:
+        check_id = _current.get()
+        if check_id is None:
+            return
+        self._write(
+            {
+                "type": "model",
+                "id": check_id,
+                "t": time.time(),
+                "prompt_key": prompt_key(prompt_text),
+                "content": content,
+                "language_hint": language_hint,
+                "text": text,
+                "usage": usage,
+                "elapsed": round(elapsed, 4),
+            }
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "path": self.path if self.enabled else None,
+            "sample": self.sample,
+            "sampled_checks": self.sampled,
+            "records": self.records,
+            "dropped": self.dropped,
+            "lost": self.lost,
+            "errors": self.errors,
+            "queue_depth": self._queue.qsize(),
+            "full": self.full,
+        }
+
+
+class _TeeStream(httpx.AsyncByteStream):
+    """Pass a response body through while keeping a copy of what was read."""
+
+    def __init__(self, inner: httpx.AsyncByteStream, on_close) -> None:
+        self._inner = inner
+        self._on_close = on_close
+        self._chunks: List[bytes] = []
+
+    async def __aiter__(self):
+        async for chunk in self._inner:
+            self._chunks.append(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+        self._on_close(b"".join(self._chunks))
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that records responses for sampled checks.
+
+    Responses for trusted-source crawls are recorded whenever capture is
+    on (unchanged pages only once), so a replay can rebuild the link
+    index. Only the body bytes the caller actually read are kept, which
+    is exactly what a replay needs to reproduce the same extraction.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, writer: CaptureWriter, crawl_urls) -> None:
+        self._inner = inner
+        self._writer = writer
+        self._crawl_urls = crawl_urls
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self._inner.handle_async_request(request)
+        crawl = str(request.url) in self._crawl_urls()
+        if _current.get() is None and not crawl:
+            return response
+        elapsed = time.perf_counter() - started
+
+        def on_close(body: bytes) -> None:
+            self._writer.record_http(request, response, body, elapsed, crawl)
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_TeeStream(response.stream, on_close),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def read_capture(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a capture file, stopping quietly at a torn tail."""
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        try:
+            for line in fh:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile):
+            return
+
+
+CAPTURE = CaptureWriter()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from urls import normalize_url
+from verdict_cache import canonicalize
+
+# Content at least this long is split into claims that are checked separately
+DECOMPOSE_MIN_CHARS = int(os.getenv("FACTMCP_DECOMPOSE_MIN_CHARS", "240"))
+# Most claims checked for one input; any beyond are folded into the last one
+MAX_CLAIMS = int(os.getenv("FACTMCP_MAX_CLAIMS", "6"))
+# Sentences shorter than this are kept with their neighbour rather than checked alone
+CLAIM_MIN_CHARS = int(os.getenv("FACTMCP_CLAIM_MIN_CHARS", "30"))
+# A claim stops absorbing dependent sentences at this length
+CLAIM_MAX_CHARS = 400
+
+# Sentence ends (including the Devanagari danda) and line breaks
+_SPLIT_RE = re.compile(r"(?<=[.!?।])\s+|\s*\n+\s*")
+# List markers: bullets, "1." / "2)" numbering
+_BULLET_RE = re.compile(r"^(?:[-*•▪►]+\s*|\d{1,2}[.)]\s+)")
+# Sentences that only make sense together with the one before them
+_DEPENDENT_RE = re.compile(
+    r"^(?:it|this|that|these|those|they|he|she|his|her|their|its|but|and|so|also|which|because|however)\b",
+    re.IGNORECASE,
+)
+
+# Ordered from least to most severe; the overall verdict is the most severe claim's
+_SEVERITY = {"Verified": 0, "Suspicious": 1, "Fake": 2}
+
+
+def split_claims(text: str, max_claims: int = MAX_CLAIMS) -> List[str]:
+    """Split `text` into separately checkable claims, in order.
+
+    Rule-based, so it costs no model call: the text is cut at sentence
+    ends and line breaks, list markers are stripped, and a sentence that
+    is very short or opens with a pronoun or connective ("It was...",
+    "But...") stays attached to the one before it so every claim reads on
+    its own. Repeats (after canonicalization) are dropped. Past
+    `max_claims`, the remaining sentences are folded into the last claim
+    so nothing is left unchecked. Returns [text] when there is nothing to
+    split.
+    """
+    claims: List[str] = []
+    seen = set()
+    for piece in _SPLIT_RE.split(text):
+        piece = _BULLET_RE.sub("", piece.strip())
+        if not any(ch.isalnum() for ch in piece):
+            continue
+        attach = claims and len(claims[-1]) + len(piece) < CLAIM_MAX_CHARS and (
+            len(piece) < CLAIM_MIN_CHARS or len(claims[-1]) < CLAIM_MIN_CHARS or _DEPENDENT_RE.match(piece)
+        )
+        if attach:
+            claims[-1] = f"{claims[-1]} {piece}"
+            continue
+        canonical = canonicalize(piece)
+        if canonical in seen:
+            continue
+        seen.add(canonical)
+        claims.append(piece)
+    if len(claims) > max_claims:
+        claims[max_claims - 1:] = [" ".join(claims[max_claims - 1:])]
+    return claims or [text]
+
+
+def should_decompose(text: str) -> Optional[List[str]]:
+    """The claims of `text` if it is long enough and holds more than one, else None."""
+    if len(text) < DECOMPOSE_MIN_CHARS:
+        return None
+    claims = split_claims(text)
+    return claims if len(claims) > 1 else None
+
+
+def combine(claims: List[str], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One overall analysis from per-claim results.
+
+    The label is the most severe claim label (one fake claim makes the
+    message fake), with the mean confidence of the claims carrying it.
+    The explanation summarizes the claim labels, evidence is the union of
+    the claims' evidence, and `claims` holds the per-claim breakdown.
+    Claims whose analysis did not finish appear in the breakdown without
+    a label and do not count towards the overall verdict; with none
+    finished the label is missing too.
+    """
+    breakdown: List[Dict[str, Any]] = []
+    evidence: List[Dict[str, Any]] = []
+    seen = set()
+    for claim, result in zip(claims, results):
+        analysis = result.get("analysis") or {}
+        breakdown.append({
+            "claim": claim,
+            "label": analysis.get("label"),
+            "confidence": analysis.get("confidence"),
+            "explanation": analysis.get("explanation"),
+            "sources": [s.get("url") for s in result.get("sources") or []],
+        })
+        for item in analysis.get("evidence") or []:
+            key = (item.get("url"), item.get("quote"))
+            if key not in seen:
+                seen.add(key)
+                evidence.append(item)
+    labelled = [c for c in breakdown if c["label"] in _SEVERITY]
+    if not labelled:
+        return {"claims": breakdown}
+    label = max((c["label"] for c in labelled), key=_SEVERITY.__getitem__)
+    confidences = [float(c["confidence"] or 0.5) for c in labelled if c["label"] == label]
+    counts = {name: sum(c["label"] == name for c in labelled) for name in _SEVERITY}
+    summary = ", ".join(f"{n} {name.lower()}" for name, n in counts.items() if n)
+    lines = [f"{len(claims)} claims checked separately: {summary}."]
+    lines += [f"Claim {i}: [{c['label']}] {c['explanation'] or ''}".strip()
+              for i, c in enumerate(breakdown, 1) if c["label"] in _SEVERITY]
+    return {
+        "label": label,
+        "explanation": "\n".join(lines),
+        "evidence": evidence,
+        "confidence": round(sum(confidences) / len(confidences), 3),
+        "claims": breakdown,
+    }
+
+
+def merge_sources(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Every claim's sources, each page once, in claim order."""
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    for result in results:
+        for source in result.get("sources") or []:
+            key = normalize_url(source.get("url", "")) or source.get("url")
+            if key not in seen:
+                seen.add(key)
+                merged.append(source)
+    return merged
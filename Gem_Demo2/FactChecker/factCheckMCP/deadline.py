@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Optional
+
+# Time budget for one check when the client does not send deadline_ms.
+# Kept under the Streamlit client's 30 s timeout so it always gets an answer.
+DEFAULT_DEADLINE_MS = int(os.getenv("FACTMCP_DEADLINE_MS", "25000"))
+
+# Share of the time left that each stage may use before the next one starts;
+# whatever a stage does not use rolls over to the later ones
+SEARCH_SHARE = float(os.getenv("FACTMCP_SEARCH_SHARE", "0.2"))
+FETCH_SHARE = float(os.getenv("FACTMCP_FETCH_SHARE", "0.4"))
+# Kept back from the model call for building and sending the response
+RESPONSE_MARGIN_SECONDS = 0.25
+
+
+class Deadline:
+    """Absolute point in time (monotonic clock) a request must answer by."""
+
+    __slots__ = ("budget", "expires_at")
+
+    def __init__(self, seconds: float) -> None:
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def from_ms(cls, deadline_ms: Optional[int]) -> "Deadline":
+        return cls((deadline_ms or DEFAULT_DEADLINE_MS) / 1000.0)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def share(self, fraction: float, cap: Optional[float] = None) -> float:
+        """Seconds a stage may use: `fraction` of the remaining time, at most `cap`."""
+        seconds = self.remaining() * fraction
+        return seconds if cap is None else min(seconds, cap)
+
+    def elapsed_ms(self) -> int:
+        return int((self.budget - (self.expires_at - time.monotonic())) * 1000)
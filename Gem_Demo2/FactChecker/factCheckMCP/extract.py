@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import codecs
+import os
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Mapping, Optional
+
+try:  # Optional fast path; the stdlib tokenizer is used when lxml is missing
+    from lxml import etree
+except ImportError:  # pragma: no cover - depends on the environment
+    etree = None
+
+# Hard cap on how much of a response body is downloaded and parsed
+FETCH_MAX_BYTES = int(os.getenv("FACTMCP_FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Text-bearing blocks; only the outermost open one collects text, so nested
+# blocks (a <p> inside an <li>) are read once
+_BLOCK_TAGS = frozenset({"p", "li", "h1", "h2", "h3", "h4", "blockquote", "pre"})
+_HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4"})
+_SKIP_TAGS = frozenset({"script", "style", "noscript", "template"})
+# Elements that group loose text (text not inside any text-bearing block);
+# their boundaries split it into candidate paragraphs for the fallback
+_CONTAINER_TAGS = frozenset({"div", "section", "article", "main", "td", "body", "header", "footer", "br"})
+# Page chrome whose whole subtree is dropped
+_BOILERPLATE_TAGS = frozenset({"nav", "header", "footer", "aside", "form", "menu"})
+# A page's own header/footer (headline, byline) inside these is content, not chrome
+_ARTICLE_TAGS = frozenset({"article", "main"})
+_BOILERPLATE_ATTR_RE = re.compile(
+    r"\b(?:nav|navbar|navigation|menu|breadcrumbs?|footer|sidebar|share|social|related|"
+    r"comments?|cookie|subscribe|newsletter|advert|ads|promo)\b",
+    re.IGNORECASE,
+)
+# Never treated as chrome because of a class name (e.g. <body class="has-sidebar">)
+_CONTENT_ROOT_TAGS = frozenset({"html", "body", "main", "article"})
+# Blocks whose text is mostly anchor text are link lists, not content
+MAX_LINK_DENSITY = 0.5
+MIN_BLOCK_CHARS = 25
+MIN_HEADING_CHARS = 10
+# With less text than this from the blocks above, loose text in divs and
+# sections is used as well (pages that put the body straight into <div>s)
+FALLBACK_MIN_CHARS = 200
+
+
+def _clean_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def check_content_type(headers: Mapping[str, str]) -> str:
+    """Validate that a response is HTML and return its declared charset.
+
+    Raises ValueError for any other media type so the body is never read.
+    A missing Content-Type is given the benefit of the doubt.
+    """
+    content_type = headers.get("content-type", "")
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type and media_type not in HTML_CONTENT_TYPES:
+        raise ValueError(f"unsupported content type: {media_type}")
+    match = re.search(r"charset=[\"']?([\w.:-]+)", content_type, re.IGNORECASE)
+    charset = match.group(1) if match else "utf-8"
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        charset = "utf-8"
+    return charset
+
+
+class _Block:
+    __slots__ = ("tag", "parts", "link_chars", "nested")
+
+    def __init__(self, tag: str) -> None:
+        self.tag = tag
+        self.parts: List[str] = []
+        self.link_chars = 0
+        self.nested = 0
+
+
+class _TextCollector:
+    """Parser target that extracts a page's title and main-content text.
+
+    Implements the lxml parser-target interface (start/end/data/close) and
+    is also driven by the stdlib tokenizer below, so both backends share
+    one single-pass extraction:
+
+    - only the outermost block element collects text, so nested blocks are
+      not repeated;
+    - navigation, sidebars, header/footer outside an <article>/<main> and
+      elements whose class/id marks them as chrome are skipped with their
+      whole subtree;
+    - blocks that are mostly link text or too short are dropped;
+    - repeated paragraphs are removed by hash.
+
+    Text outside those blocks (e.g. an article body written straight into
+    <div>s) is collected as well, split at container boundaries and put
+    through the same filters, but only used when the blocks yield less
+    than FALLBACK_MIN_CHARS. Kept text is joined with newlines in document
+    order. Once `max_chars` of usable text has been kept `done` is set and
+    feeding stops.
+    """
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self.done = False
+        self._title: List[str] = []
+        self._in_title = False
+        self._skip = 0
+        # Innermost boilerplate element being skipped: [tag, same-tag nesting]
+        self._boilerplate: List[Any] = []
+        self._block: Optional[_Block] = None
+        self._in_link = 0
+        self._article = 0
+        # Loose text since the last container boundary: [parts, link chars]
+        self._loose: List[str] = []
+        self._loose_links = 0
+        # (from the fallback, text) in document order
+        self._kept: List[Any] = []
+        self._seen: set = set()
+        self._length = 0
+        self._loose_length = 0
+        self.dropped = 0
+
+    def _is_boilerplate(self, tag: str, attrib: Any) -> bool:
+        if tag in _BOILERPLATE_TAGS:
+            return not (self._article and tag in ("header", "footer"))
+        if not attrib or tag in _CONTENT_ROOT_TAGS:
+            return False
+        marker = f"{attrib.get('class') or ''} {attrib.get('id') or ''} {attrib.get('role') or ''}"
+        return marker.strip() != "" and bool(_BOILERPLATE_ATTR_RE.search(marker))
+
+    def start(self, tag: str, attrib: Any = None) -> None:
+        if self._boilerplate:
+            if tag == self._boilerplate[-1][0]:
+                self._boilerplate[-1][1] += 1
+            return
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif self._is_boilerplate(tag, attrib):
+            self._boilerplate.append([tag, 0])
+        elif tag == "a":
+            self._in_link += 1
+        elif tag in _BLOCK_TAGS:
+            if self._block is None:
+                self._flush_loose()
+                self._block = _Block(tag)
+            else:
+                self._block.nested += 1
+                self._block.parts.append(" ")
+        if tag in _ARTICLE_TAGS:
+            self._article += 1
+        if tag in _CONTAINER_TAGS and self._block is None:
+            self._flush_loose()
+
+    def end(self, tag: str) -> None:
+        if self._boilerplate:
+            entry = self._boilerplate[-1]
+            if tag == entry[0]:
+                if entry[1]:
+                    entry[1] -= 1
+                else:
+                    self._boilerplate.pop()
+            return
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag == "a":
+            self._in_link = max(0, self._in_link - 1)
+        elif tag in _BLOCK_TAGS and self._block is not None:
+            if self._block.nested:
+                self._block.nested -= 1
+                self._block.parts.append(" ")
+            else:
+                self._finish_block()
+        if tag in _ARTICLE_TAGS:
+            self._article = max(0, self._article - 1)
+        if tag in _CONTAINER_TAGS and self._block is None:
+            self._flush_loose()
+
+    def _keep(self, text: str, min_chars: int, link_chars: int, loose: bool) -> None:
+        if len(text) < min_chars or link_chars > MAX_LINK_DENSITY * len(text):
+            self.dropped += 1
+            return
+        digest = hash(text.casefold())
+        if digest in self._seen:
+            self.dropped += 1
+            return
+        self._seen.add(digest)
+        self._kept.append((loose, text))
+        if loose:
+            self._loose_length += len(text) + 1
+        else:
+            self._length += len(text) + 1
+        if self._length >= self.max_chars or (
+            self._length < FALLBACK_MIN_CHARS and self._length + self._loose_length >= self.max_chars
+        ):
+            self.done = True
+
+    def _finish_block(self) -> None:
+        block, self._block = self._block, None
+        min_chars = MIN_HEADING_CHARS if block.tag in _HEADING_TAGS else MIN_BLOCK_CHARS
+        self._keep(_clean_text("".join(block.parts)), min_chars, block.link_chars, loose=False)
+
+    def _flush_loose(self) -> None:
+        if self._loose:
+            text = _clean_text("".join(self._loose))
+            link_chars, self._loose, self._loose_links = self._loose_links, [], 0
+            if text:
+                self._keep(text, MIN_BLOCK_CHARS, link_chars, loose=True)
+
+    def data(self, text: str) -> None:
+        if self._skip or self._boilerplate:
+            return
+        if self._in_title:
+            self._title.append(text)
+        elif self._block is not None:
+            self._block.parts.append(text)
+            if self._in_link:
+                self._block.link_chars += len(text.strip())
+        else:
+            self._loose.append(text)
+            if self._in_link:
+                self._loose_links += len(text.strip())
+
+    def close(self) -> "_TextCollector":
+        if self._block is not None:
+            self._block.nested = 0
+            self._finish_block()
+        self._flush_loose()
+        return self
+
+    @property
+    def open_block(self) -> Optional[str]:
+        return self._block.tag if self._block is not None and not self._block.nested else None
+
+    def title(self) -> str:
+        return _clean_text("".join(self._title))
+
+    def text(self) -> str:
+        fallback = self._length < FALLBACK_MIN_CHARS
+        return "\n".join(text for loose, text in self._kept if fallback or not loose)[: self.max_chars]
+
+
+class _StdlibParser(HTMLParser):
+    """Feeds the stdlib tokenizer's events into a _TextCollector."""
+
+    def __init__(self, target: _TextCollector) -> None:
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        # HTML lets <p> and <li> close implicitly when a sibling opens
+        if tag in ("p", "li") and self.target.open_block == tag:
+            self.target.end(tag)
+        self.target.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag: str) -> None:
+        self.target.end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self.target.data(data)
+
+
+class PageParser:
+    """Incremental HTML → {url, title, text} extraction.
+
+    Feed raw body chunks as they arrive; parsing stops as soon as
+    `max_chars` of text is collected (check `done` to stop downloading).
+    Uses lxml's C parser when installed, else the stdlib tokenizer.
+    """
+
+    def __init__(self, url: str, max_chars: int, charset: str = "utf-8") -> None:
+        self.url = url
+        self._collector = _TextCollector(max_chars)
+        self._decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        if etree is not None:
+            self._parser: Any = etree.HTMLParser(target=self._collector, recover=True)
+        else:
+            self._parser = _StdlibParser(self._collector)
+
+    @property
+    def done(self) -> bool:
+        return self._collector.done
+
+    def feed(self, chunk: bytes) -> None:
+        if self.done:
+            return
+        text = self._decoder.decode(chunk)
+        if text:
+            self._parser.feed(text)
+
+    def close(self) -> Dict[str, str]:
+        if not self.done:
+            tail = self._decoder.decode(b"", final=True)
+            if tail:
+                self._parser.feed(tail)
+        try:
+            self._parser.close()
+        except Exception:
+            # lxml raises on close for documents it could not recover at all
+            pass
+        self._collector.close()
+        return {
+            "url": self.url,
+            "title": self._collector.title() or self.url,
+            "text": self._collector.text(),
+        }
+
+
+def extract_page(html: bytes, url: str, max_chars: int, charset: str = "utf-8") -> Dict[str, str]:
+    """One-shot extraction of an already downloaded body."""
+    parser = PageParser(url, max_chars, charset)
+    parser.feed(html[:FETCH_MAX_BYTES])
+    return parser.close()
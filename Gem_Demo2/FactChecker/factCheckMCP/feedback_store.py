@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from settings import DATA_DIR
+
+# Directory of append-only JSONL segments; empty disables persistence
+FEEDBACK_DIR = os.getenv("FACTMCP_FEEDBACK_DIR", os.path.join(DATA_DIR, "feedback"))
+FEEDBACK_QUEUE_SIZE = int(os.getenv("FACTMCP_FEEDBACK_QUEUE_SIZE", "20000"))
+# A batch is written once it holds this many records or its oldest record is this old
+FEEDBACK_BATCH = int(os.getenv("FACTMCP_FEEDBACK_BATCH", "1000"))
+FEEDBACK_FLUSH_SECONDS = float(os.getenv("FACTMCP_FEEDBACK_FLUSH_SECONDS", "1.0"))
+# Start a new segment file once the current one reaches this size
+FEEDBACK_SEGMENT_BYTES = int(os.getenv("FACTMCP_FEEDBACK_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+
+_STOP = object()
+
+
+class FeedbackQueueFull(Exception):
+    """The write-behind queue is full; the client should retry later."""
+
+
+class FeedbackStore:
+    """Write-behind store for user feedback.
+
+    `submit` only puts the record on a bounded in-memory queue, so the
+    request path never touches the disk. A background thread drains the
+    queue in batches, written once `batch` records are waiting or the
+    oldest has waited `flush_seconds`. Each batch is one write and one
+    fsync to the current JSONL segment, so bursts cost one sync per batch
+    rather than per record. Segments are named after the time they were
+    opened and the process id, so several workers can share `directory`
+    without interleaving lines, and roll over at `segment_bytes`.
+
+    `close` (run on shutdown, and at exit) writes out everything still
+    queued. When the queue is full, `submit` raises FeedbackQueueFull
+    instead of blocking.
+    """
+
+    def __init__(
+        self,
+        directory: str = FEEDBACK_DIR,
+        queue_size: int = FEEDBACK_QUEUE_SIZE,
+        batch: int = FEEDBACK_BATCH,
+        flush_seconds: float = FEEDBACK_FLUSH_SECONDS,
+        segment_bytes: int = FEEDBACK_SEGMENT_BYTES,
+    ) -> None:
+        self.directory = directory
+        self.batch = batch
+        self.flush_seconds = flush_seconds
+        self.segment_bytes = segment_bytes
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._segment: Optional[Any] = None
+        self._segment_path: Optional[Path] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+        self.segments = 0
+        self.errors = 0
+        self.lost = 0
+        self.last_flush_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, record: Dict[str, Any]) -> str:
+        """Queue a record and return its id; never blocks."""
+        record = {"id": uuid.uuid4().hex, "received_at": time.time(), **record}
+        if not self.enabled:
+            return record["id"]
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.rejected += 1
+            raise FeedbackQueueFull(f"feedback queue is full ({self._queue.maxsize} records)") from None
+        self.accepted += 1
+        return record["id"]
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            with self._start_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="factcheck-feedback", daemon=True)
+                    self._writer.start()
+                    # Write out what is still queued when the process exits
+                    atexit.register(self.close)
+
+    def _write_loop(self) -> None:
+        pending: List[Dict[str, Any]] = []
+        oldest = 0.0
+        while True:
+            timeout = None if not pending else max(0.0, oldest + self.flush_seconds - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            stop = item is _STOP
+            if item is not None and not stop:
+                if not pending:
+                    oldest = time.monotonic()
+                pending.append(item)
+                # Take whatever else is already queued without waiting
+                while len(pending) < self.batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    pending.append(item)
+            if pending and (stop or len(pending) >= self.batch or time.monotonic() - oldest >= self.flush_seconds):
+                self._write(pending)
+                pending = []
+            if stop:
+                self._close_segment()
+                return
+
+    def _open_segment(self) -> Any:
+        if self._segment is not None and self._segment.tell() >= self.segment_bytes:
+            self._close_segment()
+        if self._segment is None:
+            Path(self.directory).mkdir(parents=True, exist_ok=True)
+            name = f"feedback-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{self.segments:04d}.jsonl"
+            self._segment_path = Path(self.directory) / name
+            self._segment = open(self._segment_path, "ab")
+            self.segments += 1
+        return self._segment
+
+    def _close_segment(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        data = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        try:
+            segment = self._open_segment()
+            segment.write(data.encode("utf-8"))
+            segment.flush()
+            os.fsync(segment.fileno())
+        except OSError:
+            # Keep the writer alive; the batch is lost but counted
+            self.errors += 1
+            self.lost += len(records)
+            self._close_segment()
+            return
+        self.written += len(records)
+        self.batches += 1
+        self.last_flush_seconds = time.perf_counter() - started
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Wait until everything queued so far is written (best effort)."""
+        deadline = time.monotonic() + timeout
+        while self._writer is not None and self.written + self.lost < self.accepted and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Write out everything queued and stop the writer."""
+        with self._start_lock:
+            writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        # Blocks only if the queue is full, until the writer has made room
+        self._queue.put(_STOP)
+        writer.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory or None,
+            "queue_depth": self.depth,
+            "queue_capacity": self._queue.maxsize,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "batches": self.batches,
+            "segments": self.segments,
+            "current_segment": str(self._segment_path) if self._segment_path else None,
+            "errors": self.errors,
+            "lost": self.lost,
+            "last_flush_seconds": round(self.last_flush_seconds, 4),
+        }
+
+
+FEEDBACK = FeedbackStore()
@@ -1,9 +1,102 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any, Dict, List, Optional
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_exponential,
+    wait_exponential_jitter,
+)
+
+from capture import CAPTURE
+from metrics import MODEL_ATTEMPTS, MODEL_RETRIES, timed
+from rate_limit import GEMINI_WAIT_SECONDS, get_limiter
+
+# Upper bound on the estimated prompt size of one call; lowest-scored
+# source passages are dropped until the prompt fits
+PROMPT_TOKEN_BUDGET = int(os.getenv("FACTMCP_PROMPT_TOKEN_BUDGET", "3000"))
+# Output tokens reserved against the TPM quota until the real count is known
+OUTPUT_TOKEN_RESERVE = int(os.getenv("FACTMCP_OUTPUT_TOKEN_RESERVE", "512"))
+
+_TRANSIENT_STATUS = frozenset({429, 500, 502, 503, 504})
+# How long a 429 pauses every caller on the key; grows with each retry
+_THROTTLE_BACKOFF = wait_exponential_jitter(multiplier=2, max=30, jitter=1)
+_ERROR_BACKOFF = wait_exponential_jitter(multiplier=0.5, max=8, jitter=0.5)
+
+
+def _status(exc: BaseException) -> Optional[int]:
+    # google.api_core errors carry the HTTP status as `code`
+    code = getattr(exc, "code", None)
+    return int(code) if isinstance(code, int) else None
+
+
+def _is_transient(exc: BaseException) -> bool:
+    return _status(exc) in _TRANSIENT_STATUS
+
+
+def _count_retry(state: RetryCallState) -> None:
+    reason = "throttled" if _status(state.outcome.exception()) == 429 else "error"
+    MODEL_RETRIES.inc(reason=reason)
+
+
+def _retry_wait(state: RetryCallState) -> float:
+    # After a 429 the limiter pause already holds the next attempt back
+    if _status(state.outcome.exception()) == 429:
+        return 0.0
+    return _ERROR_BACKOFF(state)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate Gemini token count without a count_tokens round trip.
+
+    Roughly four characters per token for ASCII text; Indic and other
+    non-Latin scripts split much finer, so they are counted at two.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 2)
+
+
+class TokenUsage:
+    """Running totals of model token usage, safe to update from worker threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.estimated_prompt_tokens = 0
+        self.passages_trimmed = 0
+
+    def record(self, usage: Dict[str, int]) -> None:
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += usage["prompt_tokens"]
+            self.output_tokens += usage["output_tokens"]
+            self.estimated_prompt_tokens += usage["estimated_prompt_tokens"]
+            self.passages_trimmed += usage["passages_trimmed"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": self.prompt_tokens + self.output_tokens,
+                "estimated_prompt_tokens": self.estimated_prompt_tokens,
+                "passages_trimmed": self.passages_trimmed,
+                "avg_prompt_tokens": round(self.prompt_tokens / self.calls, 1) if self.calls else 0.0,
+            }
 
 
 class GeminiClient:
@@ -18,6 +111,8 @@ class GeminiClient:
         api_key: str,
         model_name: str = "gemini-1.5-flash",
         system_instruction: Optional[str] = None,
+        prompt_token_budget: int = PROMPT_TOKEN_BUDGET,
+        model: Any = None,
     ) -> None:
         # Lazy import and initialization to avoid heavy imports during server startup
         self._api_key = api_key
@@ -28,7 +123,12 @@ class GeminiClient:
             "non-technical explanation and cite evidence snippets from provided or fetched sources. "
             "Be neutral, avoid sensationalism, and prefer official sources (PIB, government portals, WHO, etc.)."
         )
-        self._model = None
+        # A pre-built model (anything with generate_content[_async]) skips the SDK,
+        # e.g. the offline stand-in in benchmarks/fake_gemini.py
+        self._model = model
+        self.prompt_token_budget = prompt_token_budget
+        self.usage = TokenUsage()
+        self.limiter = get_limiter(api_key)
 
         # Prefer JSON output for downstream consumption
         self.generation_config = {
@@ -51,61 +151,222 @@ class GeminiClient:
         )
         return self._model
 
-    @retry(wait=wait_exponential(min=1, max=8), stop=stop_after_attempt(3))
-    def analyze_content(
+    async def warm(self) -> None:
+        """Build the model and open its connection ahead of the first check.
+
+        The SDK import and model construction run in a thread; the token
+        count call (cheap, and not charged against the generation quota)
+        sets up the async channel and TLS session the checks will reuse.
+        """
+        model = await asyncio.to_thread(self._get_model)
+        count_tokens = getattr(model, "count_tokens_async", None)
+        if count_tokens is not None:
+            await asyncio.wait_for(count_tokens(["warm-up"]), 10.0)
+
+    @staticmethod
+    def _source_units(fetched_sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        units = []
+        for s in fetched_sources:
+            if s.get("passages"):
+                texts = list(s["passages"])
+                scores = list(s.get("scores") or [0.0] * len(texts))
+                field = "passages"
+            else:
+                texts, scores, field = [(s.get("text") or "")[:1200]], [0.0], "snippet"
+            units.append(
+                {"url": s.get("url"), "title": s.get("title"), "field": field, "texts": texts, "scores": scores}
+            )
+        return units
+
+    def build_prompt(
         self,
         content_text: str,
         fetched_sources: List[Dict[str, Any]],
         language_hint: Optional[str] = None,
-    ) -> Dict[str, Any]:
-        """Analyze content and compare with fetched sources.
+    ) -> Tuple[str, int, int]:
+        """Serialize the request, trimmed to the prompt token budget.
 
-        fetched_sources: list of {url, title, text}
-        Returns structured JSON dict with: label, explanation, evidence[]
+        While the estimated size is over budget the lowest-scored passage
+        is dropped (snippets count as unscored, later sources go first);
+        a source left without text is dropped entirely.
+        Returns (prompt, estimated tokens, passages trimmed).
         """
+        units = self._source_units(fetched_sources)
 
-        sources_preview = [
-            {
-                "url": s.get("url"),
-                "title": s.get("title"),
-                "snippet": (s.get("text") or "")[:1200],
+        def render(kept: List[Dict[str, Any]]) -> str:
+            sources_preview = [
+                {"url": u["url"], "title": u["title"], "passages": u["texts"]}
+                if u["field"] == "passages"
+                else {"url": u["url"], "title": u["title"], "snippet": u["texts"][0]}
+                for u in kept
+                if u["texts"]
+            ]
+            prompt = {
+                "task": "fact_check_misinformation",
+                "language_hint": language_hint or "auto",
+                "requirements": [
+                    "Return strict JSON with fields: label, explanation, evidence (array of {url, quote, support: one of ['supports','refutes','unrelated']}).",
+                    "label must be one of: Verified, Suspicious, Fake.",
+                    "explanation must be short, specific, and educational.",
+                    "Use only provided sources for evidence; do not fabricate.",
+                    "Include 'confidence' as a number between 0 and 1 indicating your certainty in the label.",
+                ],
+                "content": content_text,
+                "sources": sources_preview,
             }
-            for s in fetched_sources
-        ]
-
-        prompt = {
-            "task": "fact_check_misinformation",
-            "language_hint": language_hint or "auto",
-            "requirements": [
-                "Return strict JSON with fields: label, explanation, evidence (array of {url, quote, support: one of ['supports','refutes','unrelated']}).",
-                "label must be one of: Verified, Suspicious, Fake.",
-                "explanation must be short, specific, and educational.",
-                "Use only provided sources for evidence; do not fabricate.",
-                "Include 'confidence' as a number between 0 and 1 indicating your certainty in the label.",
-            ],
-            "content": content_text,
-            "sources": sources_preview,
+            return json.dumps(prompt, ensure_ascii=False)
+
+        # Size each passage once instead of re-serializing after every drop
+        costs = {
+            (ui, ti): estimate_tokens(json.dumps(t, ensure_ascii=False)) + 1
+            for ui, u in enumerate(units)
+            for ti, t in enumerate(u["texts"])
         }
+        over = estimate_tokens(render(units)) - self.prompt_token_budget
+        drop = set()
+        if over > 0:
+            remaining = [len(u["texts"]) for u in units]
+            lowest_first = sorted(costs, key=lambda k: (units[k[0]]["scores"][k[1]], -k[0], -k[1]))
+            for unit in lowest_first:
+                if over <= 0:
+                    break
+                drop.add(unit)
+                over -= costs[unit]
+                remaining[unit[0]] -= 1
+                if not remaining[unit[0]]:
+                    # The source's url and title go with its last passage
+                    source = units[unit[0]]
+                    over -= estimate_tokens(json.dumps([source["url"], source["title"]], ensure_ascii=False)) + 8
+            for ui, u in enumerate(units):
+                u["texts"] = [t for ti, t in enumerate(u["texts"]) if (ui, ti) not in drop]
+        trimmed = len(drop)
+        prompt_text = render(units)
+        return prompt_text, estimate_tokens(prompt_text), trimmed
 
+    @retry(wait=wait_exponential(min=1, max=8), stop=stop_after_attempt(3))
+    def _generate(self, prompt_text: str):
         model = self._get_model()
-        response = model.generate_content(
-            [json.dumps(prompt, ensure_ascii=False)],
-            generation_config=self.generation_config,
-        )
+        return model.generate_content([prompt_text], generation_config=self.generation_config)
+
+    def _finish(self, response: Any, estimated: int, trimmed: int) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        metadata = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(metadata, "prompt_token_count", None) or estimated
+        output_tokens = getattr(metadata, "candidates_token_count", None) or 0
+        usage = {
+            "estimated_prompt_tokens": estimated,
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+            "passages_trimmed": trimmed,
+        }
+        self.usage.record(usage)
 
         text = response.text or "{}"
         try:
             data = json.loads(text)
             if "confidence" not in data or not isinstance(data.get("confidence"), (int, float)):
                 data["confidence"] = 0.5
-            return data
         except json.JSONDecodeError:
             # Fallback: wrap raw text
-            return {
+            data = {
                 "label": "Suspicious",
                 "explanation": text.strip(),
                 "evidence": [],
                 "confidence": 0.5,
             }
+        return data, usage
+
+    def analyze_content_with_usage(
+        self,
+        content_text: str,
+        fetched_sources: List[Dict[str, Any]],
+        language_hint: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Like analyze_content, also returning the call's token usage.
+
+        usage: {estimated_prompt_tokens, prompt_tokens, output_tokens,
+        total_tokens, passages_trimmed}; the actual counts come from the
+        response's usage metadata. Every call is added to `self.usage`.
+        """
+        prompt_text, estimated, trimmed = self.build_prompt(content_text, fetched_sources, language_hint)
+        return self._finish(self._generate(prompt_text), estimated, trimmed)
 
+    async def analyze_content_with_usage_async(
+        self,
+        content_text: str,
+        fetched_sources: List[Dict[str, Any]],
+        language_hint: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Async analyze_content_with_usage on the SDK's async call.
+
+        Each attempt first waits its turn on the API key's shared rate
+        limiter; a 429 pauses the limiter for every caller, other transient
+        errors back off with jitter. No thread is held while waiting.
+        Raises RateLimitTimeout if capacity is not available within
+        `timeout` seconds (FACTMCP_GEMINI_WAIT_SECONDS by default).
+        """
+        with timed("prompt"):
+            prompt_text, estimated, trimmed = self.build_prompt(content_text, fetched_sources, language_hint)
+        reserved = estimated + OUTPUT_TOKEN_RESERVE
+        timeout = GEMINI_WAIT_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        model = self._get_model()
+
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception(_is_transient),
+            wait=_retry_wait,
+            stop=stop_after_attempt(4) | stop_after_delay(timeout),
+            before_sleep=_count_retry,
+            reraise=True,
+        ):
+            with attempt:
+                with timed("quota_wait"):
+                    await self.limiter.acquire(reserved, deadline)
+                called = time.perf_counter()
+                try:
+                    with timed("model_call"):
+                        response = await model.generate_content_async(
+                            [prompt_text], generation_config=self.generation_config
+                        )
+                except Exception as exc:
+                    throttled = _status(exc) == 429
+                    MODEL_ATTEMPTS.inc(outcome="throttled" if throttled else "error")
+                    if throttled:
+                        self.limiter.backoff(_THROTTLE_BACKOFF(attempt.retry_state))
+                    raise
+                MODEL_ATTEMPTS.inc(outcome="ok")
+        data, usage = self._finish(response, estimated, trimmed)
+        self.limiter.settle(reserved, usage["total_tokens"])
+        CAPTURE.record_model(
+            prompt_text, content_text, language_hint, response.text or "", usage, time.perf_counter() - called
+        )
+        return data, usage
 
+    async def analyze_content_async(
+        self,
+        content_text: str,
+        fetched_sources: List[Dict[str, Any]],
+        language_hint: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        data, _ = await self.analyze_content_with_usage_async(
+            content_text, fetched_sources, language_hint, timeout
+        )
+        return data
+
+    def analyze_content(
+        self,
+        content_text: str,
+        fetched_sources: List[Dict[str, Any]],
+        language_hint: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Analyze content and compare with fetched sources.
+
+        fetched_sources: list of {url, title, text}, or {url, title, passages,
+        scores} as chosen by passages.select_evidence. Without passages the
+        start of each page's text is sent.
+        Returns structured JSON dict with: label, explanation, evidence[]
+        """
+        data, _ = self.analyze_content_with_usage(content_text, fetched_sources, language_hint)
+        return data
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import httpx
+
+_async_client: Optional[httpx.AsyncClient] = None
+# Replaces the network transport when set (used by the replay tool)
+_transport_override: Optional[httpx.AsyncBaseTransport] = None
+
+
+def _http2_available() -> bool:
+    # httpx only negotiates HTTP/2 when the optional `h2` package is installed
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the process-wide async HTTP client, creating it on first use.
+
+    All outbound requests made by the API go through this client so that
+    connections to trusted sites are pooled and kept alive across requests.
+    HTTP/2 is negotiated where the server and installed extras allow it.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(timeout=15.0, follow_redirects=True, transport=_make_transport())
+    return _async_client
+
+
+def _make_transport() -> httpx.AsyncBaseTransport:
+    if _transport_override is not None:
+        return _transport_override
+    # http2/limits have to be set on the transport itself once one is passed
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+        http2=_http2_available(),
+        # Idle connections outlive the default 5 s so the startup crawl's stay warm for the first checks
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+    )
+    from capture import CAPTURE, RecordingTransport
+
+    if CAPTURE.enabled:
+        from link_index import LINK_INDEX
+
+        transport = RecordingTransport(transport, CAPTURE, lambda: LINK_INDEX.sources)
+    return transport
+
+
+def set_transport(transport: Optional[httpx.AsyncBaseTransport]) -> None:
+    """Route the shared client through `transport` (None restores the network)."""
+    global _transport_override, _async_client
+    _transport_override = transport
+    _async_client = None
+
+
+async def aclose_async_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
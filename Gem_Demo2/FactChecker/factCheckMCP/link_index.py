@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from http_client import get_async_client
+from parse_pool import PARSE_POOL
+from urls import normalize_url
+
+TRUSTED_SOURCES = [
+    "https://pib.gov.in/PressReleasePage.aspx",
+    "https://www.factcheck.pib.gov.in/",
+    "https://www.who.int/",
+    "https://www.unicef.org/",
+    "https://www.reuters.com/",
+    "https://www.altnews.in/",
+    "https://www.boomlive.in/",
+    "https://wikipedia.org/",
+]
+# Comma-separated override, e.g. to point the index at local stand-ins when benchmarking
+if os.getenv("FACTMCP_TRUSTED_SOURCES"):
+    TRUSTED_SOURCES = [u.strip() for u in os.environ["FACTMCP_TRUSTED_SOURCES"].split(",") if u.strip()]
+
+# How often the background task re-crawls the trusted sources (seconds)
+INDEX_REFRESH_SECONDS = float(os.getenv("FACTMCP_INDEX_REFRESH_SECONDS", "900"))
+# How often a search waiting for the first crawl reports progress (seconds)
+PROGRESS_INTERVAL = 0.5
+
+# Awaited with (sites crawled, sites to crawl)
+Progress = Callable[[int, int], Awaitable[None]]
+
+# Latin word characters plus the Indic script blocks (Devanagari .. Sinhala),
+# so that vowel signs do not split Hindi/Bengali/Tamil words apart
+_TOKEN_RE = re.compile(r"[\w\u0900-\u0DFF]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS
+    ]
+
+
+def _page_links(html: str, base: str) -> List[Tuple[str, str]]:
+    """Extract (absolute_url, title) pairs for every titled anchor on a page."""
+    # Imported on first crawl (in the background), not when the API starts
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    links: List[Tuple[str, str]] = []
+    for a in soup.find_all("a", href=True):
+        title = re.sub(r"\s+", " ", a.get_text() or "").strip()
+        if len(title) < 8:
+            continue
+        url = normalize_url(a["href"], base)
+        if url:
+            links.append((url, title))
+    return links
+
+
+@dataclass
+class _Snapshot:
+    postings: Dict[str, Set[str]] = field(default_factory=dict)
+    titles: Dict[str, str] = field(default_factory=dict)
+    built_at: float = 0.0
+
+
+class LinkIndex:
+    """In-memory inverted index of anchor titles found on the trusted sources.
+
+    A refresh crawls every trusted base concurrently, tokenizes anchor text
+    and swaps in a freshly built snapshot, so searches never see a
+    half-built index. Searches are answered from the current snapshot by
+    IDF-weighted token overlap with the query.
+
+    Staleness: with the background refresher running, results are at most
+    `refresh_interval` plus one crawl (a few seconds) old. Without it (e.g.
+    the stdio MCP server) a search that finds the index older than
+    `refresh_interval` serves the stale snapshot and schedules a refresh;
+    only a search against an empty index waits for a crawl.
+    """
+
+    def __init__(
+        self,
+        sources: List[str],
+        refresh_interval: float = INDEX_REFRESH_SECONDS,
+        crawl_timeout: float = 10.0,
+    ) -> None:
+        self.sources = sources
+        self.refresh_interval = refresh_interval
+        self.crawl_timeout = crawl_timeout
+        self._snapshot = _Snapshot()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.refresh_count = 0
+        self.refresh_errors = 0
+        self.last_refresh_seconds = 0.0
+        # Sites finished in the refresh in progress (or the last one)
+        self.crawled = 0
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._snapshot.titles)
+
+    @property
+    def age(self) -> float:
+        if not self._snapshot.built_at:
+            return math.inf
+        return time.time() - self._snapshot.built_at
+
+    async def _crawl(self, base: str) -> List[Tuple[str, str]]:
+        r = await get_async_client().get(base, timeout=self.crawl_timeout)
+        r.raise_for_status()
+        return await PARSE_POOL.links(r.text, str(r.url))
+
+    async def _crawl_counted(self, base: str) -> List[Tuple[str, str]]:
+        try:
+            return await self._crawl(base)
+        finally:
+            self.crawled += 1
+
+    async def _refresh(self) -> None:
+        started = time.perf_counter()
+        self.crawled = 0
+        results = await asyncio.gather(
+            *(self._crawl_counted(base) for base in self.sources), return_exceptions=True
+        )
+        snapshot = _Snapshot(built_at=time.time())
+        for result in results:
+            if isinstance(result, BaseException):
+                self.refresh_errors += 1
+                continue
+            for url, title in result:
+                if url in snapshot.titles:
+                    continue
+                snapshot.titles[url] = title
+                for token in set(tokenize(title)):
+                    snapshot.postings.setdefault(token, set()).add(url)
+        if snapshot.titles or not self._snapshot.titles:
+            # Keep serving the previous snapshot if every site failed this round
+            self._snapshot = snapshot
+        self.refresh_count += 1
+        self.last_refresh_seconds = time.perf_counter() - started
+
+    def refresh(self) -> asyncio.Task:
+        """Start a refresh, or return the one already in progress."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def run_forever(self) -> None:
+        """Refresh on a fixed schedule; run as a background task."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                self.refresh_errors += 1
+            await asyncio.sleep(self.refresh_interval)
+
+    async def ensure_ready(self, timeout: float, progress: Optional[Progress] = None) -> None:
+        """Wait up to `timeout` for the first crawl; later calls only schedule refreshes.
+
+        `progress`, if given, is awaited with (sites crawled, sites) every
+        PROGRESS_INTERVAL seconds while waiting and once at the end.
+        """
+        if not self._snapshot.titles:
+            if progress is None:
+                try:
+                    await asyncio.wait_for(asyncio.shield(self.refresh()), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                return
+            task = self.refresh()
+            deadline = time.monotonic() + timeout
+            while not task.done() and deadline > time.monotonic():
+                await progress(self.crawled, len(self.sources))
+                # Not cancelled on timeout: the crawl carries on for later searches
+                await asyncio.wait({task}, timeout=min(PROGRESS_INTERVAL, deadline - time.monotonic()))
+            await progress(self.crawled, len(self.sources))
+        elif self.age > self.refresh_interval:
+            self.refresh()
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, str]]:
+        snapshot = self._snapshot
+        q_tokens = set(tokenize(query))
+        if not q_tokens or not snapshot.titles:
+            return []
+        n_docs = len(snapshot.titles)
+        scores: Dict[str, float] = {}
+        matched: Dict[str, int] = {}
+        for token in sorted(q_tokens):
+            urls = snapshot.postings.get(token)
+            if not urls:
+                continue
+            idf = math.log(1 + n_docs / len(urls))
+            for url in urls:
+                scores[url] = scores.get(url, 0.0) + idf
+                matched[url] = matched.get(url, 0) + 1
+        # Require two shared tokens unless the query itself is a single token
+        min_overlap = min(2, len(q_tokens))
+        ranked = sorted(
+            (url for url in scores if matched[url] >= min_overlap),
+            # URL last so ties rank the same in every process (set order follows the hash seed)
+            key=lambda url: (-scores[url], len(snapshot.titles[url]), url),
+        )
+        return [{"url": url, "title": snapshot.titles[url]} for url in ranked[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "links": len(self._snapshot.titles),
+            "tokens": len(self._snapshot.postings),
+            "age_seconds": None if math.isinf(self.age) else round(self.age, 1),
+            "refresh_interval_seconds": self.refresh_interval,
+            "refresh_count": self.refresh_count,
+            "refresh_errors": self.refresh_errors,
+            "last_refresh_seconds": round(self.last_refresh_seconds, 3),
+        }
+
+
+LINK_INDEX = LinkIndex(TRUSTED_SOURCES)
@@ -26,15 +26,17 @@
 #     run_http()
 
 from dotenv import load_dotenv
+
+# Before any project import: modules read their FACTMCP_* settings at import
+load_dotenv()  # reads .env
+
 import os
 import uvicorn
 from api import create_app
-from settings import settings
-
-load_dotenv()  # reads .env
+from settings import get_settings
 
 def run_http() -> None:
-    app = create_app(settings.gemini_api_key)
+    app = create_app(get_settings().gemini_api_key)
     host = os.getenv("FACTMCP_HTTP_HOST", "0.0.0.0")
     port = int(os.getenv("FACTMCP_HTTP_PORT", 8080))
     uvicorn.run(app, host=host, port=port)
@@ -1,96 +1,142 @@
 from __future__ import annotations
 
-import re
+import asyncio
+import os
 from typing import Any, Dict, List, Optional
 
-import httpx
-from bs4 import BeautifulSoup
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
-
-def _clean_text(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+# The tools' implementations live in sources.py so the API can use them without the MCP SDK
+import sources
+from settings import BATCH_CONCURRENCY, MAX_CONCURRENCY
+from sources import FETCH_CONCURRENCY, SEARCH_TIMEOUT
+from urls import normalize_url
 
 
+# Every tool is async and runs on the server's event loop, on the same
+# shared connection pool, page cache and link index as the HTTP API, so
+# calls from several clients (or several calls from one) overlap instead
+# of queuing behind a blocking one. Served from the API process (see
+# FACTMCP_MCP_HTTP in api.py) they also share its verdict cache, model
+# rate limiter and in-flight coalescing.
 mcp = FastMCP("FactCheckMCP")
 
 
 @mcp.tool()
-def search(query: str, limit: int = 5) -> List[Dict[str, str]]:
+async def search(
+    query: str, limit: int = 5, timeout: float = SEARCH_TIMEOUT, ctx: Optional[Context] = None
+) -> List[Dict[str, str]]:
     """Search trusted sources for a query.
 
-    Returns a list of {url, title} from a small curated set of endpoints.
+    Returns a list of {url, title} from a small curated set of endpoints,
+    ranked by token overlap between the query and the link titles. Results
+    are served from an in-memory index of the trusted sites that is
+    refreshed in the background; only the very first search waits (up to
+    `timeout` seconds) for the initial crawl, reporting progress as sites
+    are crawled.
     """
-    trusted = [
-        "https://pib.gov.in/PressReleasePage.aspx",
-        "https://www.factcheck.pib.gov.in/",
-        "https://www.who.int/",
-        "https://www.unicef.org/",
-        "https://www.reuters.com/",
-        "https://www.altnews.in/",
-        "https://www.boomlive.in/",
-        "https://wikipedia.org/",
-    ]
-
-    results: List[Dict[str, str]] = []
-    # Minimal heuristic search by fetching home pages; in production, replace with search APIs
-    for base in trusted:
-        if len(results) >= limit:
-            break
-        try:
-            with httpx.Client(timeout=10.0, follow_redirects=True) as client:
-                r = client.get(base)
-                r.raise_for_status()
-        except Exception:
-            continue
-
-        soup = BeautifulSoup(r.text, "html.parser")
-        for a in soup.find_all("a", href=True):
-            title = _clean_text(a.get_text() or "")
-            href = a["href"]
-            if not title or len(title) < 8:
-                continue
-            if query.lower() in title.lower():
-                if href.startswith("/"):
-                    # Best effort join
-                    href = base.rstrip("/") + href
-                results.append({"url": href, "title": title})
-                if len(results) >= limit:
-                    break
-    return results[:limit]
+
+    async def progress(crawled: int, total: int) -> None:
+        await ctx.report_progress(crawled, total, f"crawled {crawled} of {total} trusted sites")
+
+    return await sources.search(query, limit, timeout, progress if ctx is not None else None)
 
 
 @mcp.tool()
-def fetch_url(url: str, max_chars: int = 40000) -> Dict[str, str]:
+async def fetch_url(url: str, max_chars: int = 40000) -> Dict[str, str]:
     """Fetch and extract main text from a URL.
 
-    Returns {url, title, text}.
+    Returns {url, title, text}. Pages are served from the shared page cache
+    while fresh and revalidated with a conditional GET once stale.
+    Non-HTML responses are rejected and the body is capped in size.
+    """
+    return await sources.fetch_url_async(url, max_chars)
+
+
+@mcp.tool()
+async def fetch_many(
+    urls: List[str],
+    max_chars: int = 40000,
+    concurrency: int = FETCH_CONCURRENCY,
+    ctx: Optional[Context] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch and extract several URLs in one call.
+
+    Duplicate URLs (after normalization) are fetched once, at most
+    `concurrency` (up to 64) at a time and a few per host. Returns one entry per
+    distinct URL in completion order: {index, url, page: {url, title,
+    text}} or {index, url, error}, where `index` is the URL's position in
+    `urls`. Progress is reported as each page completes.
+    """
+    keys = [normalize_url(url) for url in urls]
+    # One result per distinct URL, and one per URL that is not http(s)
+    total = len({k for k in keys if k is not None}) + keys.count(None)
+    results: List[Dict[str, Any]] = []
+    async for result in sources.fetch_many(urls, max_chars, min(MAX_CONCURRENCY, max(1, concurrency))):
+        results.append(result)
+        if ctx is not None:
+            outcome = "failed" if "error" in result else "fetched"
+            await ctx.report_progress(len(results), total, f"{outcome} {result['url']}")
+    return results
+
+
+@mcp.tool()
+async def detect_scam(content: str) -> Dict[str, Any]:
+    """Pattern-based scam heuristics (UPI, KYC, lottery, investment, ...).
+
+    Rules come from scam_rules.json and are compiled once. Returns
+    is_suspicious (combined rule weights at or above the rules' threshold,
+    0.5), an overall score, per-category scores, the matched rule ids and
+    the character spans that triggered them.
     """
-    with httpx.Client(timeout=15.0, follow_redirects=True) as client:
-        r = client.get(url)
-        r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-    title = _clean_text(soup.title.get_text()) if soup.title else url
-    # Simple extraction heuristic
-    paragraphs = [
-        _clean_text(p.get_text(" ")) for p in soup.find_all(["article", "p", "li"])
-    ]
-    text = _clean_text(" ".join(p for p in paragraphs if p))[:max_chars]
-    return {"url": url, "title": title, "text": text}
+    # Off the loop: the first call compiles the rules and long inputs take a while to scan
+    return await asyncio.to_thread(sources.detect_scam, content)
+
+
+_pipeline = None
+
+
+def set_pipeline(pipeline) -> None:
+    """Run verification tools on `pipeline` (the API's, when served from it)."""
+    global _pipeline
+    _pipeline = pipeline
+
+
+def _get_pipeline():
+    # Imported lazily: most tools never need the model client
+    global _pipeline
+    if _pipeline is None:
+        from gemini_client import GeminiClient
+        from pipeline import CheckPipeline
+
+        api_key = os.getenv("FACTMCP_GEMINI_API_KEY")
+        if not api_key:
+            raise RuntimeError("FACTMCP_GEMINI_API_KEY is required for verification tools")
+        _pipeline = CheckPipeline(GeminiClient(api_key=api_key))
+    return _pipeline
 
 
 @mcp.tool()
-def detect_scam(content: str) -> Dict[str, Any]:
-    """Lightweight pattern-based scam heuristics (UPI, KYC, lottery, investment)."""
-    patterns = [
-        r"free\s*lottery|won\s*prize",
-        r"update\s*KYC|block\s*account",
-        r"OTP\s*sharing",
-        r"90%\s*returns|double\s*investment",
-        r"urgent\s*payment|UPI\s*transfer",
-    ]
-    matches = [p for p in patterns if re.search(p, content, re.IGNORECASE)]
-    return {"is_suspicious": bool(matches), "matched": matches}
+async def check_batch(
+    claims: List[str],
+    language_hint: Optional[str] = None,
+    concurrency: int = BATCH_CONCURRENCY,
+    ctx: Optional[Context] = None,
+) -> List[Dict[str, Any]]:
+    """Fact-check many claims at once.
+
+    Sources are searched for every claim and each distinct page is fetched
+    once for the whole batch. Returns one result per claim in completion
+    order, each with the claim's `index`; failed claims carry an `error`.
+    Progress is reported as each claim completes.
+    """
+    pipeline = _get_pipeline()
+    results: List[Dict[str, Any]] = []
+    async for result in pipeline.run_batch(claims, language_hint, min(MAX_CONCURRENCY, max(1, concurrency))):
+        results.append(result)
+        if ctx is not None:
+            await ctx.report_progress(len(results), len(claims), f"checked {len(results)} of {len(claims)} claims")
+    return results
 
 
 @mcp.prompt()
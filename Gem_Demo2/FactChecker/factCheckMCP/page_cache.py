@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from store import STORE, Store
+
+PAGE_CACHE_TTL = float(os.getenv("FACTMCP_PAGE_CACHE_TTL", "3600"))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("FACTMCP_PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# How long the persistent store keeps a page (and its validators) after its last fetch
+PAGE_STORE_RETENTION = float(os.getenv("FACTMCP_PAGE_STORE_RETENTION", str(7 * 86400)))
+
+
+@dataclass
+class _Entry:
+    page: Dict[str, str]
+    max_chars: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    raw_bytes: int
+    stored_at: float
+
+    @property
+    def size(self) -> int:
+        return sum(len(v) for v in self.page.values())
+
+
+class PageCache:
+    """Bounded LRU cache of extracted pages keyed by normalized URL.
+
+    Entries hold the extracted {url, title, text} plus the ETag and
+    Last-Modified validators of the response they came from. Within `ttl`
+    an entry is served as-is; after that the caller is handed conditional
+    headers so the page is revalidated with a conditional GET, and a 304
+    refreshes the entry without downloading or parsing the body again.
+    Least recently used entries are evicted once `max_bytes` is exceeded.
+
+    Every stored or revalidated page is also written to the persistent
+    `backing_store`, which is consulted on an in-memory miss; freshness is judged
+    from the original fetch time, so a page another worker fetched an
+    hour ago is revalidated rather than served.
+
+    Thread-safe, so it can also be used from worker threads. Callers on
+    the event loop use `alookup`, which makes the store read on a thread.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+        ttl: float = PAGE_CACHE_TTL,
+        backing_store: Optional[Store] = STORE,
+        retention: float = PAGE_STORE_RETENTION,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.backing_store = backing_store
+        self.retention = retention
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self.store_hits = 0
+
+    @staticmethod
+    def _view(entry: _Entry, max_chars: int) -> Dict[str, str]:
+        page = dict(entry.page)
+        page["text"] = page["text"][:max_chars]
+        return page
+
+    def lookup(self, key: str, max_chars: int) -> Tuple[Optional[Dict[str, str]], Dict[str, str]]:
+        """Return (page, conditional_headers) for a fetch of `key`.
+
+        `page` is set on a fresh hit. Otherwise `conditional_headers` carries
+        the validators of a stale entry (empty on a plain miss).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.max_chars < max_chars:
+            # Outside the lock: the store read may touch disk
+            found = self.backing_store.get("page", key) if self.backing_store is not None else None
+            entry = self._load(key, max_chars, found)
+        return self._answer(key, entry, max_chars)
+
+    async def alookup(self, key: str, max_chars: int) -> Tuple[Optional[Dict[str, str]], Dict[str, str]]:
+        """`lookup` without blocking the event loop on the store read."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.max_chars < max_chars:
+            found = await self.backing_store.aget("page", key) if self.backing_store is not None else None
+            entry = self._load(key, max_chars, found)
+        return self._answer(key, entry, max_chars)
+
+    def _answer(
+        self, key: str, entry: Optional[_Entry], max_chars: int
+    ) -> Tuple[Optional[Dict[str, str]], Dict[str, str]]:
+        with self._lock:
+            if entry is None or self._entries.get(key) is not entry:
+                self.misses += 1
+                return None, {}
+            self._entries.move_to_end(key)
+            if time.monotonic() - entry.stored_at < self.ttl:
+                self.hits += 1
+                self.bytes_saved += entry.raw_bytes
+                return self._view(entry, max_chars), {}
+            headers: Dict[str, str] = {}
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+            if headers:
+                self.revalidations += 1
+            else:
+                self.misses += 1
+            return None, headers
+
+    def _load(self, key: str, max_chars: int, found: Optional[Tuple[Dict[str, Any], float]]) -> Optional[_Entry]:
+        if found is None or found[0]["max_chars"] < max_chars:
+            return None
+        value, stored_at = found
+        entry = _Entry(
+            page=value["page"],
+            max_chars=value["max_chars"],
+            etag=value["etag"],
+            last_modified=value["last_modified"],
+            raw_bytes=value["raw_bytes"],
+            # Carry the fetch time over onto this process's monotonic clock
+            stored_at=time.monotonic() - max(0.0, time.time() - stored_at),
+        )
+        with self._lock:
+            if not self._insert(key, entry):
+                return None
+            self.store_hits += 1
+        return entry
+
+    def _persist(self, key: str, entry: _Entry) -> None:
+        if self.backing_store is None:
+            return
+        value = {
+            "page": entry.page,
+            "max_chars": entry.max_chars,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "raw_bytes": entry.raw_bytes,
+        }
+        stored_at = time.time() - (time.monotonic() - entry.stored_at)
+        self.backing_store.put("page", key, value, self.retention, stored_at)
+
+    def revalidated(self, key: str, max_chars: int) -> Optional[Dict[str, str]]:
+        """Mark `key` fresh again after a 304 and return the cached page."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.stored_at = time.monotonic()
+            self.not_modified += 1
+            self.bytes_saved += entry.raw_bytes
+            page = self._view(entry, max_chars)
+        self._persist(key, entry)
+        return page
+
+    def _insert(self, key: str, entry: _Entry) -> bool:
+        # Called with the lock held
+        if entry.size > self.max_bytes:
+            return False
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+        return True
+
+    def store(
+        self,
+        key: str,
+        page: Dict[str, str],
+        max_chars: int,
+        headers: Any,
+        raw_bytes: int,
+    ) -> None:
+        entry = _Entry(
+            page=dict(page),
+            max_chars=max_chars,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            raw_bytes=raw_bytes,
+            stored_at=time.monotonic(),
+        )
+        with self._lock:
+            self._insert(key, entry)
+        self._persist(key, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "bytes_saved": self.bytes_saved,
+                "store_hits": self.store_hits,
+            }
+
+
+PAGE_CACHE = PageCache()
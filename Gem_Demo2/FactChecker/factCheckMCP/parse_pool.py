@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import codecs
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from extract import FETCH_MAX_BYTES, PageParser, extract_page
+
+# Worker processes for HTML parsing; 0 parses everything in the serving process
+PARSE_WORKERS = int(os.getenv("FACTMCP_PARSE_WORKERS", "0"))
+# Bodies up to this size are parsed inline, where shipping them to a worker costs more than it saves
+PARSE_INLINE_BYTES = int(os.getenv("FACTMCP_PARSE_INLINE_BYTES", str(128 * 1024)))
+# Largest body sent to a worker; longer bodies are cut at this size
+PARSE_MAX_TASK_BYTES = int(os.getenv("FACTMCP_PARSE_MAX_TASK_BYTES", str(FETCH_MAX_BYTES)))
+# Streamed bodies are parsed on a worker thread in batches of this many bytes
+FEED_BATCH_BYTES = 64 * 1024
+# A body buffered for the pool stops downloading once its visible text is
+# estimated at this many times max_chars (the estimate includes page chrome)
+BUFFERED_TEXT_SLACK = 3
+
+# Markup dropped by the visible-text estimate; the last item of a fragment
+# may be cut off (no closing tag, "-->" or ">" yet)
+_MARKUP_RE = re.compile(r"<(script|style)\b.*?(?:</\1\s*>|\Z)|<!--.*?(?:-->|\Z)|<[^>]*(?:>|\Z)", re.S | re.I)
+_CLOSED_MARKUP_RE = re.compile(r"<(script|style)\b.*</\1\s*>|<!--.*-->|<[^>]*>", re.S | re.I)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _visible_chars(html: str) -> Tuple[int, str]:
+    """Rough count of non-space text characters in an HTML fragment.
+
+    Returns the count and any unfinished markup at the end of the fragment,
+    which belongs in front of the next one.
+    """
+    count, tail, pos = 0, "", 0
+    for match in _MARKUP_RE.finditer(html):
+        count += len(_SPACE_RE.sub("", html[pos:match.start()]))
+        pos = match.end()
+        if pos == len(html) and not _CLOSED_MARKUP_RE.fullmatch(match.group()):
+            tail = match.group()
+    return count + len(_SPACE_RE.sub("", html[pos:])), tail
+
+
+class ParsePool:
+    """Optional process pool for CPU-bound HTML parsing.
+
+    Parsing is pure Python (or lxml driven from Python callbacks) and holds
+    the GIL, so more threads do not add parse throughput. With `workers`
+    above 0, bodies larger than `inline_bytes` are parsed in worker
+    processes, which receive the raw bytes and send back only the
+    extracted {url, title, text} (or the (url, title) links of an index
+    page). Smaller bodies are parsed inline. Workers are started with
+    "spawn", as forking a process that runs an event loop and threads
+    is unsafe. A pool that breaks (e.g. a worker killed for memory) is
+    replaced on the next call and that call is parsed inline.
+    """
+
+    def __init__(
+        self,
+        workers: int = PARSE_WORKERS,
+        inline_bytes: int = PARSE_INLINE_BYTES,
+        max_task_bytes: int = PARSE_MAX_TASK_BYTES,
+    ) -> None:
+        self.workers = workers
+        self.inline_bytes = inline_bytes
+        self.max_task_bytes = max_task_bytes
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.inline = 0
+        self.offloaded = 0
+        self.offloaded_bytes = 0
+        self.restarts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def offloads(self, size: int) -> bool:
+        return self.enabled and size > self.inline_bytes
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _broken(self, executor: Executor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, fn, *args: Any) -> Any:
+        executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._broken(executor)
+            return await asyncio.to_thread(fn, *args)
+
+    async def extract(self, body: bytes, url: str, max_chars: int, charset: str = "utf-8") -> Dict[str, str]:
+        """extract_page, in a worker when `body` is large enough to be worth it."""
+        if not self.offloads(len(body)):
+            self.inline += 1
+            return extract_page(body, url, max_chars, charset)
+        body = body[: self.max_task_bytes]
+        self.offloaded += 1
+        self.offloaded_bytes += len(body)
+        return await self._submit(extract_page, body, url, max_chars, charset)
+
+    async def links(self, html: str, base: str) -> List[Tuple[str, str]]:
+        """(absolute_url, title) of every titled anchor on an index page."""
+        # Imported here: link_index uses this module
+        from link_index import _page_links
+
+        if not self.offloads(len(html)):
+            self.inline += 1
+            return await asyncio.to_thread(_page_links, html, base)
+        self.offloaded += 1
+        self.offloaded_bytes += len(html)
+        return await self._submit(_page_links, html[: self.max_task_bytes], base)
+
+    async def warm(self) -> None:
+        """Start every worker now instead of on the first large page."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.workers)))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "inline_bytes": self.inline_bytes,
+            "max_task_bytes": self.max_task_bytes,
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+            "offloaded_bytes": self.offloaded_bytes,
+            "restarts": self.restarts,
+        }
+
+
+class StreamingExtractor:
+    """Extraction of a streamed body that moves to the pool once it is large.
+
+    Chunks are parsed in this process as they arrive, so a small page (or
+    one whose first `max_chars` of text arrive early) never leaves it;
+    `afeed` collects them into FEED_BATCH_BYTES batches and parses each
+    on a thread, keeping the event loop free (the stdlib HTMLParser takes
+    about a second for a 2 MB page). Once more than the pool's
+    `inline_bytes` have been received the body is buffered instead and
+    handed to a worker by `aclose`; `done` then turns true when a cheap
+    estimate of the visible text received passes BUFFERED_TEXT_SLACK ×
+    `max_chars`, or at the pool's task size limit.
+    """
+
+    def __init__(self, url: str, max_chars: int, charset: str = "utf-8", pool: Optional[ParsePool] = None) -> None:
+        self.url = url
+        self.max_chars = max_chars
+        self.charset = charset
+        self.pool = pool or PARSE_POOL
+        self._inline: Optional[PageParser] = PageParser(url, max_chars, charset)
+        # Everything received so far, kept only while a hand-over is possible
+        self._body: Optional[bytearray] = bytearray() if self.pool.enabled else None
+        # Received by afeed but not parsed yet
+        self._pending = bytearray()
+        self.received = 0
+        # Estimated visible text in the buffered body, counted once buffering starts
+        self._text_estimate = 0
+        self._decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        self._markup_tail = ""
+
+    @property
+    def done(self) -> bool:
+        if self._inline is not None:
+            return self._inline.done
+        return (
+            self.received >= self.pool.max_task_bytes
+            or self._text_estimate >= BUFFERED_TEXT_SLACK * self.max_chars
+        )
+
+    def feed(self, chunk: bytes) -> None:
+        self.received += len(chunk)
+        if self._body is not None:
+            self._body += chunk
+        if self._inline is None:
+            self._estimate(chunk)
+            return
+        if self.pool.offloads(self.received):
+            self._inline = None
+            self._estimate(bytes(self._body))
+        else:
+            self._inline.feed(chunk)
+
+    def _estimate(self, chunk: bytes) -> None:
+        count, self._markup_tail = _visible_chars(self._markup_tail + self._decoder.decode(chunk))
+        self._text_estimate += count
+
+    async def afeed(self, chunk: bytes) -> None:
+        """feed, batched and off the event loop; check `done` after each call."""
+        self._pending += chunk
+        if len(self._pending) >= FEED_BATCH_BYTES:
+            await self._drain()
+
+    async def _drain(self) -> None:
+        if self._pending:
+            batch, self._pending = bytes(self._pending), bytearray()
+            await asyncio.to_thread(self.feed, batch)
+
+    async def aclose(self) -> Dict[str, str]:
+        await self._drain()
+        if self._inline is not None:
+            self.pool.inline += 1
+            return self._inline.close()
+        return await self.pool.extract(bytes(self._body), self.url, self.max_chars, self.charset)
+
+
+PARSE_POOL = ParsePool()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from link_index import tokenize
+
+# Total characters of source text sent to the model for one claim
+EVIDENCE_BUDGET_CHARS = int(os.getenv("FACTMCP_EVIDENCE_BUDGET_CHARS", "4000"))
+# Target passage size; consecutive short blocks are merged up to this length
+PASSAGE_CHARS = int(os.getenv("FACTMCP_PASSAGE_CHARS", "500"))
+
+# Passages scoring below this fraction of the best passage are left out
+MIN_RELATIVE_SCORE = 0.2
+
+# BM25 parameters (the usual defaults)
+_K1 = 1.2
+_B = 0.75
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?।])\s+")
+
+
+def _pieces(block: str, size: int) -> List[str]:
+    """Split an over-long block at sentence ends, then at spaces."""
+    out: List[str] = []
+    for sentence in _SENTENCE_RE.split(block):
+        while len(sentence) > size:
+            cut = sentence.rfind(" ", 0, size)
+            cut = cut if cut > 0 else size
+            out.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            out.append(sentence)
+    return out
+
+
+def split_passages(text: str, size: int = PASSAGE_CHARS) -> List[str]:
+    """Cut extracted page text into passages of roughly `size` characters.
+
+    Extracted text has one block (paragraph, list item, heading) per line;
+    short neighbouring blocks are merged and long ones split at sentence
+    ends, so passages keep their sentences whole where possible.
+    """
+    passages: List[str] = []
+    current = ""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        for piece in _pieces(line, size) if len(line) > size else (line,):
+            if current and len(current) + 1 + len(piece) > size:
+                passages.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def bm25_scores(query: str, passages: Sequence[str]) -> np.ndarray:
+    """BM25 score of every passage against `query`.
+
+    Term frequencies are gathered into a passages × query-terms matrix and
+    scored in one vectorized pass; document frequencies come from the
+    passages themselves, so terms that appear everywhere weigh little.
+    """
+    terms = {t: i for i, t in enumerate(dict.fromkeys(tokenize(query)))}
+    if not terms or not passages:
+        return np.zeros(len(passages))
+    lengths = np.empty(len(passages))
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, passage in enumerate(passages):
+        tokens = tokenize(passage)
+        lengths[row] = len(tokens)
+        for token in tokens:
+            col = terms.get(token)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    tf = np.zeros((len(passages), len(terms)))
+    np.add.at(tf, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(passages) - df + 0.5) / (df + 0.5))
+    norm = _K1 * (1.0 - _B + _B * lengths / max(lengths.mean(), 1.0))
+    return (idf * tf * (_K1 + 1.0) / (tf + norm[:, None])).sum(axis=1)
+
+
+def select_evidence(
+    claim: str,
+    sources: Sequence[Dict[str, Any]],
+    budget: int = EVIDENCE_BUDGET_CHARS,
+) -> List[Dict[str, Any]]:
+    """Pick the passages of `sources` most relevant to `claim` within `budget` chars.
+
+    sources: list of {url, title, text}
+    Returns [{url, title, passages, scores}] for the sources that
+    contributed, passages in page order. Every source's best matching
+    passage is taken first so one long page cannot crowd out the others,
+    then the remaining budget is filled by score. Weak matches (below
+    MIN_RELATIVE_SCORE of the best) are never sent. When nothing matches
+    the claim at all, each source's opening passage is used instead.
+    """
+    owners: List[Tuple[int, int]] = []  # (source, position in page)
+    texts: List[str] = []
+    for s_index, source in enumerate(sources):
+        for position, passage in enumerate(split_passages(source.get("text") or "")):
+            owners.append((s_index, position))
+            texts.append(passage)
+    if not texts:
+        return []
+
+    scores = bm25_scores(claim, texts)
+    floor = max(scores.max() * MIN_RELATIVE_SCORE, 1e-9)
+    ranked = [int(i) for i in np.argsort(-scores, kind="stable") if scores[i] >= floor]
+    if not ranked:
+        ranked = [i for i, (_, position) in enumerate(owners) if position == 0]
+
+    chosen: set = set()
+    used = 0
+    covered: set = set()
+    # First pass: the best passage of each source; second: everything else by score
+    for first_pass in (True, False):
+        for i in ranked:
+            owner = owners[i][0]
+            if i in chosen or (first_pass and owner in covered):
+                continue
+            if used + len(texts[i]) > budget:
+                continue
+            chosen.add(i)
+            covered.add(owner)
+            used += len(texts[i])
+
+    by_source: Dict[int, List[int]] = {}
+    for i in sorted(chosen):
+        by_source.setdefault(owners[i][0], []).append(i)
+    return [
+        {
+            "url": sources[s_index].get("url"),
+            "title": sources[s_index].get("title"),
+            "passages": [texts[i] for i in picked],
+            "scores": [round(float(scores[i]), 3) for i in picked],
+        }
+        for s_index, picked in sorted(by_source.items())
+    ]
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from claims import combine, merge_sources, should_decompose
+from deadline import FETCH_SHARE, RESPONSE_MARGIN_SECONDS, SEARCH_SHARE, Deadline
+from gemini_client import GeminiClient
+from link_index import LINK_INDEX
+from metrics import CHECKS, timed
+from passages import select_evidence
+from settings import BATCH_CONCURRENCY
+from singleflight import SingleFlight
+from sources import SEARCH_TIMEOUT, FetchLimiter, detect_scam, fetch_many, search
+from urls import normalize_url
+from verdict_cache import VERDICT_CACHE, VerdictCache, claim_key
+
+# Receives (event, data) for each pipeline stage as it completes
+Emit = Callable[[str, Dict[str, Any]], None]
+
+
+class CheckPipeline:
+    """Async fact-check pipeline: search → concurrent fetch → rank → analyze.
+
+    Source pages are fetched concurrently on the shared connection pool and
+    scam heuristics run while those fetches are in flight, so latency is
+    roughly the slowest fetch plus the model call. Only the passages that
+    best match the claim, within a fixed character budget, are sent to the
+    model rather than the start of every page.
+
+    Completed verdicts go into a verdict cache; exact and near-duplicate
+    repeats of a claim are answered from it without searching or calling
+    the model, and the response's `cache` field says which layer served it.
+    Fresh verdicts carry the model call's token counts in `usage`.
+
+    Every check runs against a deadline: search and fetch each get a share
+    of the remaining time and the model call gets the rest, so a request
+    answers within its budget (partially, if need be) instead of after the
+    sum of every stage's worst-case timeout.
+    Concurrent misses for the same claim and language are coalesced so
+    only the first one runs the pipeline and the rest share its result.
+
+    Long content holding several claims (see claims.py) is split, and each
+    claim is searched and verified on its own, in parallel and through the
+    verdict cache, so latency follows the slowest claim and a claim seen in
+    an earlier message is not checked again. The claim verdicts are then
+    combined into one analysis with a per-claim breakdown.
+    """
+
+    def __init__(
+        self,
+        gemini: GeminiClient,
+        search_limit: int = 4,
+        verdicts: VerdictCache = VERDICT_CACHE,
+    ) -> None:
+        self.gemini = gemini
+        self.search_limit = search_limit
+        self.verdicts = verdicts
+        self.inflight = SingleFlight()
+
+    async def run(
+        self,
+        content: str,
+        language_hint: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """Check `content`, answering by `deadline` (server default if None).
+
+        Stages that run out of time are cut short and the verdict is made
+        from whatever finished; such results carry `partial: true` and list
+        the cut stages in `incomplete`, and are not cached.
+        """
+        deadline = deadline or Deadline.from_ms(None)
+        cached = await self.verdicts.aget(content, language_hint)
+        if cached is not None:
+            return self._cached(cached, detect_scam(content))
+        claims = should_decompose(content)
+        if claims is not None:
+            return await self._decomposed(content, claims, language_hint, deadline)
+        return await self._coalesced(content, language_hint, deadline)
+
+    @staticmethod
+    def _cached(cached: Dict[str, Any], scam: Dict[str, Any]) -> Dict[str, Any]:
+        CHECKS.inc(result=f"cache_{cached['cache']['layer']}")
+        return {**cached, "scam": scam, "partial": False, "incomplete": []}
+
+    async def _coalesced(
+        self,
+        content: str,
+        language_hint: Optional[str],
+        deadline: Deadline,
+        emit: Optional[Emit] = None,
+    ) -> Dict[str, Any]:
+        scope = asyncio.timeout(deadline.remaining())
+        try:
+            async with scope:
+                return await self.inflight.do(
+                    claim_key(content, language_hint),
+                    lambda: self._execute(content, language_hint, deadline, emit),
+                )
+        except TimeoutError:
+            if not scope.expired():
+                raise
+            # Coalesced onto a check with a later deadline that is still running
+            CHECKS.inc(result="partial")
+            return {
+                "analysis": {},
+                "scam": detect_scam(content),
+                "sources": [],
+                "cache": {"hit": False},
+                "usage": None,
+                "partial": True,
+                "incomplete": ["search", "fetch", "analysis"],
+            }
+
+    async def _claim(self, claim: str, language_hint: Optional[str], deadline: Deadline) -> Dict[str, Any]:
+        cached = await self.verdicts.aget(claim, language_hint)
+        if cached is not None:
+            return self._cached(cached, {})
+        return await self._coalesced(claim, language_hint, deadline)
+
+    async def _decomposed(
+        self,
+        content: str,
+        claims: List[str],
+        language_hint: Optional[str],
+        deadline: Deadline,
+        emit: Optional[Emit] = None,
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(self._claim(claim, language_hint, deadline)) for claim in claims]
+        if emit is not None:
+            for index, (claim, task) in enumerate(zip(claims, tasks)):
+                task.add_done_callback(
+                    lambda t, index=index, claim=claim: emit(
+                        "claim", {"index": index, "claim": claim, **t.result()}
+                    )
+                    if not t.cancelled() and t.exception() is None
+                    else None
+                )
+        with timed("scam"):
+            scam = detect_scam(content)
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        errors = [o for o in outcomes if isinstance(o, BaseException)]
+        if len(errors) == len(outcomes):
+            raise errors[0]
+        # A claim that failed outright counts as one whose analysis did not finish
+        results = [{"incomplete": ["analysis"]} if isinstance(o, BaseException) else o for o in outcomes]
+        cut = {stage for r in results for stage in r["incomplete"]}
+        incomplete = [stage for stage in ("search", "fetch", "analysis") if stage in cut]
+        usages = [r["usage"] for r in results if r.get("usage")]
+        usage = {k: sum(u.get(k, 0) for u in usages) for k in usages[0]} if usages else None
+        analysis = combine(claims, results)
+        sources = merge_sources(results)
+        if not incomplete:
+            self.verdicts.put(content, language_hint, analysis, sources, elapsed=time.perf_counter() - started)
+        claim_hits = sum(bool(r.get("cache", {}).get("hit")) for r in results)
+        return {
+            "analysis": analysis,
+            "scam": scam,
+            "sources": sources,
+            "cache": {"hit": False, "claim_hits": claim_hits},
+            "usage": usage,
+            "partial": bool(incomplete),
+            "incomplete": incomplete,
+        }
+
+    @staticmethod
+    def _successful(results: List[Any]) -> List[Dict[str, Any]]:
+        return [r for r in results if not isinstance(r, BaseException)]
+
+    async def _verify(
+        self,
+        content: str,
+        language_hint: Optional[str],
+        hits: List[Dict[str, Any]],
+        fetched: List[Dict[str, Any]],
+        scam: Dict[str, Any],
+        started: float,
+        deadline: Optional[Deadline] = None,
+        incomplete: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        incomplete = incomplete if incomplete is not None else []
+        with timed("rank"):
+            evidence = await asyncio.to_thread(select_evidence, content, fetched)
+        analysis: Dict[str, Any] = {}
+        usage: Optional[Dict[str, int]] = None
+        budget = None if deadline is None else deadline.remaining() - RESPONSE_MARGIN_SECONDS
+        if budget is not None and budget <= 0:
+            incomplete.append("analysis")
+        else:
+            try:
+                with timed("model"):
+                    async with asyncio.timeout(budget):
+                        analysis, usage = await self.gemini.analyze_content_with_usage_async(
+                            content, evidence, language_hint, timeout=budget
+                        )
+            except TimeoutError:
+                # Out of time waiting for quota or for the model itself
+                if budget is None:
+                    raise
+                incomplete.append("analysis")
+        sources = fetched or hits
+        CHECKS.inc(result="partial" if incomplete else "fresh")
+        if not incomplete:
+            self.verdicts.put(
+                content, language_hint, analysis, sources, elapsed=time.perf_counter() - started
+            )
+        # Include sources in response for UI display
+        return {
+            "analysis": analysis,
+            "scam": scam,
+            "sources": sources,
+            "cache": {"hit": False},
+            "usage": usage,
+            "partial": bool(incomplete),
+            "incomplete": incomplete,
+        }
+
+    async def _execute(
+        self,
+        content: str,
+        language_hint: Optional[str],
+        deadline: Deadline,
+        emit: Optional[Emit] = None,
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        incomplete: List[str] = []
+        with timed("search"):
+            hits = await search(
+                content, limit=self.search_limit, timeout=deadline.share(SEARCH_SHARE, SEARCH_TIMEOUT)
+            )
+        if not LINK_INDEX.ready:
+            incomplete.append("search")
+        if emit is not None:
+            emit("hits", {"hits": hits})
+
+        # (hit index, page), in completion order
+        pages: List[Tuple[int, Dict[str, Any]]] = []
+
+        async def collect() -> None:
+            async for item in fetch_many([h["url"] for h in hits]):
+                if "page" in item:
+                    pages.append((item["index"], item["page"]))
+                    if emit is not None:
+                        emit("source", item["page"])
+
+        fetching = asyncio.create_task(collect()) if hits else None
+        with timed("scam"):
+            scam = detect_scam(content)
+        if fetching is not None:
+            # Slow pages are dropped so the model still gets its share of the time
+            with timed("fetch"):
+                try:
+                    await asyncio.wait_for(fetching, timeout=deadline.share(FETCH_SHARE))
+                except TimeoutError:
+                    incomplete.append("fetch")
+        # Back in search rank order, so the prompt does not depend on which page was fastest
+        fetched = [page for _, page in sorted(pages, key=lambda p: p[0])]
+        return await self._verify(
+            content, language_hint, hits, fetched, scam, started, deadline, incomplete
+        )
+
+    async def stream(
+        self,
+        content: str,
+        language_hint: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Run the pipeline, yielding (event, data) as each stage completes.
+
+        Events: `scam` first (no I/O involved), then `hits`, one `source`
+        per fetched page and finally `result`, whose data is exactly what
+        `run` returns. Cache hits and requests coalesced onto an identical
+        in-flight check skip straight from `scam` to `result`. Content
+        split into several claims sends `claims` (the list) after `scam`,
+        then one `claim` per claim as it is verified (its `index`, text and
+        result) instead of `hits` and `source`.
+        """
+        deadline = deadline or Deadline.from_ms(None)
+        scam = detect_scam(content)
+        yield "scam", scam
+        cached = await self.verdicts.aget(content, language_hint)
+        if cached is not None:
+            yield "result", self._cached(cached, scam)
+            return
+
+        events: "asyncio.Queue[Tuple[str, Dict[str, Any]]]" = asyncio.Queue()
+        emit: Emit = lambda event, data: events.put_nowait((event, data))
+        claims = should_decompose(content)
+        if claims is not None:
+            yield "claims", {"claims": claims}
+            result = asyncio.create_task(self._decomposed(content, claims, language_hint, deadline, emit=emit))
+        else:
+            result = asyncio.create_task(self._coalesced(content, language_hint, deadline, emit=emit))
+        try:
+            while not result.done():
+                next_event = asyncio.create_task(events.get())
+                await asyncio.wait({next_event, result}, return_when=asyncio.FIRST_COMPLETED)
+                if next_event.done():
+                    yield next_event.result()
+                else:
+                    next_event.cancel()
+            while not events.empty():
+                yield events.get_nowait()
+            yield "result", result.result()
+        finally:
+            result.cancel()
+
+    async def run_batch(
+        self,
+        claims: List[str],
+        language_hint: Optional[str] = None,
+        concurrency: int = BATCH_CONCURRENCY,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Verify many claims, yielding each result as soon as it is ready.
+
+        Every claim is searched up front; source pages are shared across
+        the whole batch so each URL is downloaded and parsed once, under
+        one FetchLimiter (so a large batch against one site stays within
+        the per-host limit), and at most `concurrency` model calls run at
+        the same time. Results carry
+        the claim's `index` in `claims`; a claim that fails yields an
+        `error` instead of aborting the batch.
+        """
+        limiter = asyncio.Semaphore(concurrency)
+        fetches = FetchLimiter()
+        pages: Dict[str, asyncio.Task] = {}
+
+        def page(url: str) -> asyncio.Task:
+            key = normalize_url(url) or url
+            if key not in pages:
+                pages[key] = asyncio.create_task(fetches.fetch(url))
+            return pages[key]
+
+        async def execute(content: str) -> Dict[str, Any]:
+            started = time.perf_counter()
+            hits = await search(content, limit=self.search_limit)
+            # Shielded: a page task is shared with other claims in the batch
+            results = await asyncio.gather(
+                *(asyncio.shield(page(h["url"])) for h in hits), return_exceptions=True
+            )
+            scam = detect_scam(content)
+            async with limiter:
+                return await self._verify(
+                    content, language_hint, hits, self._successful(results), scam, started
+                )
+
+        async def verify_one(index: int, content: str) -> Dict[str, Any]:
+            try:
+                cached = await self.verdicts.aget(content, language_hint)
+                if cached is not None:
+                    result = self._cached(cached, detect_scam(content))
+                else:
+                    result = await self.inflight.do(
+                        claim_key(content, language_hint), lambda: execute(content)
+                    )
+            except Exception as exc:
+                return {"index": index, "content": content, "error": str(exc) or type(exc).__name__}
+            return {"index": index, "content": content, **result}
+
+        tasks = [asyncio.create_task(verify_one(i, c)) for i, c in enumerate(claims)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            for task in pages.values():
+                task.cancel()
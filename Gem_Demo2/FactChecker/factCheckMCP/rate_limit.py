@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Dict, Optional
+
+# Model quota per API key; requests beyond it wait for capacity instead of
+# being sent and rejected with 429
+GEMINI_RPM = float(os.getenv("FACTMCP_GEMINI_RPM", "60"))
+GEMINI_TPM = float(os.getenv("FACTMCP_GEMINI_TPM", "1000000"))
+# How long a call may wait for capacity (queueing plus retries) by default
+GEMINI_WAIT_SECONDS = float(os.getenv("FACTMCP_GEMINI_WAIT_SECONDS", "30"))
+
+
+class RateLimitTimeout(TimeoutError):
+    """Capacity did not free up before the caller's deadline."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"model rate limit: retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Continuous-refill bucket: `capacity` units, refilled over `period` seconds."""
+
+    def __init__(self, capacity: float, period: float = 60.0) -> None:
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (amounts above capacity wait for a full bucket)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        # May go negative for oversized requests; later callers then wait longer
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one API key.
+
+    Callers queue in arrival order: the first waiter holds the queue while
+    it sleeps until both buckets can cover it, so a burst drains at the
+    quota rate instead of being sent at once and rejected together. A
+    caller whose deadline would pass before its turn gets RateLimitTimeout
+    straight away rather than sleeping for nothing.
+
+    `backoff` pauses the whole key after a 429 so every queued call backs
+    off together, and `settle` corrects a reservation once the actual
+    token count of the call is known.
+    """
+
+    def __init__(self, rpm: float = GEMINI_RPM, tpm: float = GEMINI_TPM) -> None:
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._queue = asyncio.Lock()
+        self._paused_until = 0.0
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self.timeouts = 0
+        self.throttled = 0
+        self.waiting = 0
+
+    async def acquire(self, tokens: int, deadline: Optional[float] = None) -> None:
+        """Wait until one request of `tokens` tokens fits the quota.
+
+        deadline: time.monotonic() value after which to give up.
+        """
+        started = time.monotonic()
+        remaining = None if deadline is None else deadline - started
+        self.waiting += 1
+        try:
+            try:
+                async with asyncio.timeout(remaining):
+                    await self._queue.acquire()
+            except TimeoutError:
+                self.timeouts += 1
+                raise RateLimitTimeout(self._eta(tokens)) from None
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = max(
+                        self._paused_until - now,
+                        self.requests.wait_time(1, now),
+                        self.tokens.wait_time(tokens, now),
+                    )
+                    if wait <= 0:
+                        break
+                    if deadline is not None and now + wait > deadline:
+                        self.timeouts += 1
+                        raise RateLimitTimeout(wait)
+                    await asyncio.sleep(wait)
+                self.requests.take(1)
+                self.tokens.take(tokens)
+                self.acquired += 1
+                self.waited_seconds += time.monotonic() - started
+            finally:
+                self._queue.release()
+        finally:
+            # Also on cancellation from an outer scope (e.g. the pipeline's deadline)
+            self.waiting -= 1
+
+    def _eta(self, tokens: int) -> float:
+        now = time.monotonic()
+        return max(
+            self._paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+            0.0,
+        )
+
+    def settle(self, reserved: int, actual: int) -> None:
+        if actual > reserved:
+            self.tokens.take(actual - reserved)
+        else:
+            self.tokens.give(reserved - actual)
+
+    def backoff(self, seconds: float) -> None:
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self.requests._refill(now)
+        self.tokens._refill(now)
+        return {
+            "rpm": self.requests.capacity,
+            "tpm": self.tokens.capacity,
+            "requests_available": round(self.requests.level, 1),
+            "tokens_available": round(self.tokens.level),
+            "paused_seconds": round(max(0.0, self._paused_until - now), 2),
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "avg_wait_seconds": round(self.waited_seconds / self.acquired, 3) if self.acquired else 0.0,
+            "timeouts": self.timeouts,
+            "throttled": self.throttled,
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_limiter(api_key: str) -> RateLimiter:
+    """Return the limiter shared by every client using `api_key`."""
+    key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = _limiters[key] = RateLimiter()
+    return limiter
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SCAM_RULES_PATH = os.getenv(
+    "FACTMCP_SCAM_RULES", str(Path(__file__).resolve().parent / "scam_rules.json")
+)
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    category: str
+    weight: float
+
+
+def _is_word_char(ch: str) -> bool:
+    # Combining marks count as part of a word so Indic vowel signs do not act as boundaries
+    return ch.isalnum() or ch == "_" or unicodedata.category(ch).startswith("M")
+
+
+class _Automaton:
+    """Aho-Corasick automaton over lower-cased phrases.
+
+    Scanning is a single pass over the text whose cost depends on the text
+    length and the number of matches, not on how many phrases were added.
+    """
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (rule index, phrase length) for every phrase ending here
+        self._out: List[List[Tuple[int, int]]] = [[]]
+
+    def add(self, phrase: str, rule: int) -> None:
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((rule, len(phrase)))
+
+    def build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state == 0:
+                    continue  # depth-1 states fail back to the root
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield (rule, start, end) for each whole-word phrase occurrence.
+
+        Whitespace runs in `text` match a single space in a phrase; offsets
+        refer to the original text.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = "".join(ch.lower()[0] for ch in text)
+        positions: List[int] = []
+        state = 0
+        prev_space = True
+        for i, ch in enumerate(lowered):
+            if ch.isspace():
+                if prev_space:
+                    continue
+                ch, prev_space = " ", True
+            else:
+                prev_space = False
+            positions.append(i)
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            for rule, length in out[state]:
+                start = positions[len(positions) - length]
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if i + 1 < len(text) and _is_word_char(text[i + 1]):
+                    continue
+                yield rule, start, i + 1
+
+
+class ScamEngine:
+    """Weighted scam-indicator scanner compiled from a rules file.
+
+    Rules carry an id, category and weight and a list of literal
+    `phrases` (any script; matched case-insensitively on word boundaries),
+    a `regex` (case-insensitive, no implicit boundaries), or both. All
+    phrases are compiled into one Aho-Corasick automaton, so their cost
+    does not grow with the phrase count. Each regex is scanned on its own:
+    regexes may overlap (a shortened link ending in ".apk" is both), and
+    one alternation would only report the first of two overlapping
+    matches.
+
+    A category's score combines the weights of its distinct matched rules
+    as independent evidence, 1 - Π(1 - w); the overall score combines the
+    category scores the same way. Content is flagged suspicious once the
+    overall score reaches the threshold, so a single rule of weight below
+    it (e.g. a Telegram tips group, 0.3) is reported in `matched` and
+    `spans` without flagging the content on its own.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], threshold: float = 0.5) -> None:
+        self.threshold = threshold
+        self.rules: List[Rule] = []
+        self._automaton = _Automaton()
+        self._regexes: List[Tuple[int, "re.Pattern[str]"]] = []
+        for spec in rules:
+            index = len(self.rules)
+            self.rules.append(Rule(spec["id"], spec["category"], float(spec["weight"])))
+            for phrase in spec.get("phrases", ()):
+                phrase = re.sub(r"\s+", " ", phrase.strip().lower())
+                if phrase:
+                    self._automaton.add(phrase, index)
+            if spec.get("regex"):
+                self._regexes.append((index, re.compile(spec["regex"], re.IGNORECASE)))
+        self._automaton.build()
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScamEngine":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return cls(data["rules"], threshold=float(data.get("threshold", 0.5)))
+
+    def _matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        yield from self._automaton.scan(text)
+        for index, regex in self._regexes:
+            for m in regex.finditer(text):
+                if m.end() > m.start():
+                    yield index, m.start(), m.end()
+
+    def scan(self, text: str) -> Dict[str, Any]:
+        spans: List[Dict[str, Any]] = []
+        matched: Dict[int, Rule] = {}
+        seen = set()
+        for index, start, end in self._matches(text):
+            # A rule's phrase and regex may both match the same text
+            if (index, start, end) in seen:
+                continue
+            seen.add((index, start, end))
+            rule = self.rules[index]
+            matched[index] = rule
+            spans.append(
+                {"start": start, "end": end, "text": text[start:end], "rule": rule.id, "category": rule.category}
+            )
+
+        remaining: Dict[str, float] = {}
+        for rule in matched.values():
+            remaining[rule.category] = remaining.get(rule.category, 1.0) * (1.0 - rule.weight)
+        categories = {cat: round(1.0 - rest, 3) for cat, rest in remaining.items()}
+        overall = 1.0
+        for score in categories.values():
+            overall *= 1.0 - score
+        score = round(1.0 - overall, 3)
+
+        spans.sort(key=lambda s: s["start"])
+        return {
+            "is_suspicious": score >= self.threshold,
+            "score": score,
+            "categories": categories,
+            "matched": sorted(rule.id for rule in matched.values()),
+            "spans": spans,
+        }
+
+
+_engine: Optional[ScamEngine] = None
+
+
+def get_engine() -> ScamEngine:
+    """Return the engine for FACTMCP_SCAM_RULES, compiling it on first use."""
+    global _engine
+    if _engine is None:
+        _engine = ScamEngine.from_file(SCAM_RULES_PATH)
+    return _engine
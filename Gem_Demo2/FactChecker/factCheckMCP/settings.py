@@ -1,7 +1,19 @@
 from __future__ import annotations
 
+import os
+from functools import lru_cache
+from typing import Any
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Local state (the SQLite store, feedback segments). Read at import like the
+# module-level settings that use it, which must work without an API key
+DATA_DIR = os.getenv("FACTMCP_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+# Default number of concurrent model calls for a batch verification, and the
+# most any caller of the API or MCP tools may ask for
+BATCH_CONCURRENCY = int(os.getenv("FACTMCP_BATCH_CONCURRENCY", "8"))
+MAX_CONCURRENCY = 64
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_prefix="FACTMCP_")
@@ -11,6 +23,14 @@ class Settings(BaseSettings):
     http_port: int = 8080
 
 
-settings = Settings()  # reads environment
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Read the environment (and .env) on first use rather than at import."""
+    return Settings()
 
 
+def __getattr__(name: str) -> Any:
+    # `from settings import settings` keeps working, resolved lazily
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
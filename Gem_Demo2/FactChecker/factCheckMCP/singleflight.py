@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call(Generic[T]):
+    task: "asyncio.Task[T]"
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key onto a single execution.
+
+    The first caller for a key starts `fn()` as its own task; callers that
+    arrive while it is running await the same task instead of starting
+    another. The task is shielded from any single caller's cancellation
+    (e.g. one client disconnecting) and is only cancelled once every
+    waiter has gone. A failure is re-raised to all current waiters, and
+    the key is forgotten as soon as the task finishes, so the next call
+    after a failure starts afresh.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call[Any]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def _forget(self, key: str, call: _Call[Any]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled() and call.task.exception() is not None:
+            self.failures += 1
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            # Keys are content hashes; a prefix is enough to tell them apart
+            "waiters": {key[:12]: call.waiters for key, call in self._calls.items()},
+        }
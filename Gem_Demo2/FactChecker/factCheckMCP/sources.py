@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from extract import FETCH_MAX_BYTES, check_content_type
+from http_client import get_async_client
+from link_index import LINK_INDEX, Progress
+from metrics import FETCH_SECONDS
+from page_cache import PAGE_CACHE
+from parse_pool import StreamingExtractor
+from scam_engine import get_engine
+from urls import normalize_url
+
+
+# Upper bound on how long a search waits for the link index to be built
+SEARCH_TIMEOUT = 8.0
+# fetch_many: pages downloaded at once in one call, and at most this many from any one host
+FETCH_CONCURRENCY = int(os.getenv("FACTMCP_FETCH_CONCURRENCY", "8"))
+FETCH_PER_HOST = int(os.getenv("FACTMCP_FETCH_PER_HOST", "4"))
+
+
+async def search(
+    query: str, limit: int = 5, timeout: float = SEARCH_TIMEOUT, progress: Optional[Progress] = None
+) -> List[Dict[str, str]]:
+    """Top `limit` {url, title} links on the trusted sites for `query`.
+
+    `progress` is passed on to LinkIndex.ensure_ready, for callers that
+    want to report on a search waiting for the first crawl.
+    """
+    await LINK_INDEX.ensure_ready(timeout, progress)
+    return LINK_INDEX.search(query, limit)
+
+
+async def _stream_page(
+    url: str, max_chars: int, headers: Dict[str, str]
+) -> Tuple[Optional[Dict[str, str]], httpx.Headers, int]:
+    """GET `url` and extract it while the body streams in.
+
+    Returns (page, response headers, body bytes read); page is None on a
+    304. Non-HTML responses are rejected from their headers alone, at most
+    FETCH_MAX_BYTES of body is read, and the download stops as soon as
+    `max_chars` of text has been extracted. Parsing runs on a thread, in
+    batches, so a large page does not stall the event loop. With a parse pool configured,
+    large bodies are extracted in a worker process once downloaded.
+    """
+    async with get_async_client().stream("GET", url, headers=headers, timeout=15.0) as r:
+        if r.status_code == 304:
+            return None, r.headers, 0
+        r.raise_for_status()
+        parser = StreamingExtractor(url, max_chars, check_content_type(r.headers))
+        received = 0
+        async for chunk in r.aiter_bytes():
+            chunk = chunk[: FETCH_MAX_BYTES - received]
+            received += len(chunk)
+            await parser.afeed(chunk)
+            if parser.done or received >= FETCH_MAX_BYTES:
+                break
+    return await parser.aclose(), r.headers, received
+
+
+async def _fetch_page_async(url: str, max_chars: int) -> Tuple[Dict[str, str], str]:
+    key = normalize_url(url) or url
+    page, conditional = await PAGE_CACHE.alookup(key, max_chars)
+    if page is not None:
+        return page, "cached"
+    page, headers, received = await _stream_page(url, max_chars, conditional)
+    if page is None:
+        page = PAGE_CACHE.revalidated(key, max_chars)
+        if page is not None:
+            return page, "not_modified"
+        # Entry was evicted meanwhile; fetch the page unconditionally
+        page, headers, received = await _stream_page(url, max_chars, {})
+        if page is None:
+            raise ValueError(f"unexpected 304 for unconditional GET of {url}")
+    PAGE_CACHE.store(key, page, max_chars, headers, received)
+    return page, "fetched"
+
+
+async def fetch_url_async(url: str, max_chars: int = 40000) -> Dict[str, str]:
+    """{url, title, text} of a page, through the shared page cache and connection pool."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        page, outcome = await _fetch_page_async(url, max_chars)
+        return page
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        FETCH_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+
+
+class FetchLimiter:
+    """Caps downloads at `concurrency` at a time and `per_host` per host.
+
+    Share one between fetches that should respect the same limits, e.g.
+    every page of a batch check.
+    """
+
+    def __init__(self, concurrency: int = FETCH_CONCURRENCY, per_host: int = FETCH_PER_HOST) -> None:
+        self.per_host = max(1, per_host)
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    async def fetch(self, url: str, max_chars: int = 40000) -> Dict[str, str]:
+        """fetch_url_async once a slot for the URL's host is free."""
+        host = urlsplit(normalize_url(url) or url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        async with self._hosts[host], self._slots:
+            return await fetch_url_async(url, max_chars)
+
+
+async def fetch_many(
+    urls: List[str],
+    max_chars: int = 40000,
+    concurrency: int = FETCH_CONCURRENCY,
+    per_host: int = FETCH_PER_HOST,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Fetch several pages at once, yielding each as soon as it is ready.
+
+    URLs are normalized and each page is fetched once, however often it
+    is listed. At most `concurrency` downloads run at a time and at most
+    `per_host` of them against the same host. Yields, in completion
+    order, {index, url, page} or {index, url, error}, where `index` is the
+    URL's first position in `urls`; one failed page never ends the
+    stream. Closing the iterator early cancels the fetches still running.
+    """
+    limiter = FetchLimiter(concurrency, per_host)
+    seen = set()
+    tasks: List[asyncio.Task] = []
+    invalid: List[Dict[str, Any]] = []
+
+    async def fetch_one(index: int, url: str) -> Dict[str, Any]:
+        try:
+            return {"index": index, "url": url, "page": await limiter.fetch(url, max_chars)}
+        except Exception as exc:
+            return {"index": index, "url": url, "error": f"{type(exc).__name__}: {exc}".rstrip(": ")}
+
+    for index, url in enumerate(urls):
+        key = normalize_url(url)
+        if key is None:
+            invalid.append({"index": index, "url": url, "error": "not an http(s) URL"})
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        tasks.append(asyncio.create_task(fetch_one(index, url)))
+    try:
+        for result in invalid:
+            yield result
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def detect_scam(content: str) -> Dict[str, Any]:
+    """Scan `content` with the compiled scam rules.
+
+    Unlike the original pattern list, which flagged content on any match,
+    `is_suspicious` is set once the combined rule weights reach the rules
+    file's threshold (0.5): every rule carried over from that list weighs
+    at least 0.5 and still flags on its own, while weaker indicators (a
+    UPI handle, a link shortener) need company. `matched` lists rule ids
+    rather than regex patterns; `score`, `categories` and `spans` say how
+    the verdict was reached.
+    """
+    return get_engine().scan(content)
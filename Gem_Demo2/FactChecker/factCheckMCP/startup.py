@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from link_index import LINK_INDEX
+from parse_pool import PARSE_POOL
+from scam_engine import get_engine
+from verdict_cache import VERDICT_CACHE
+
+# Warm the model, caches and connection pools in the background at startup
+PREWARM = os.getenv("FACTMCP_PREWARM", "1") not in ("0", "false", "no")
+# /readyz reports ready after this long even if a warm-up step is still running
+READY_TIMEOUT = float(os.getenv("FACTMCP_READY_TIMEOUT", "30"))
+
+
+class Startup:
+    """Background warm-up of a freshly started API process.
+
+    Without it the first /check after a scale-from-zero pays for importing
+    the Gemini SDK, building the model, opening TLS connections to the
+    model endpoint and the trusted sites, crawling the link index and
+    compiling the scam rules. `run` does all of that concurrently while
+    the process already answers /healthz; /readyz turns ready once every
+    step has finished (failed steps included, they are reported) or after
+    `ready_timeout`, whichever comes first, so a load balancer only
+    routes traffic to a warm instance.
+    """
+
+    def __init__(self, gemini: Any, ready_timeout: float = READY_TIMEOUT) -> None:
+        self.gemini = gemini
+        self.ready_timeout = ready_timeout
+        self.started = time.monotonic()
+        self.steps: Dict[str, str] = {}
+        self.step_seconds: Dict[str, float] = {}
+        self.ready_after: Optional[float] = None
+        self._done = asyncio.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() or time.monotonic() - self.started >= self.ready_timeout
+
+    async def _step(self, name: str, fn: Callable[[], Awaitable[Any]]) -> None:
+        self.steps[name] = "running"
+        started = time.perf_counter()
+        try:
+            await fn()
+            self.steps[name] = "ok"
+        except Exception as exc:
+            self.steps[name] = f"failed: {type(exc).__name__}: {exc}"[:200]
+        self.step_seconds[name] = round(time.perf_counter() - started, 3)
+
+    async def _link_index(self) -> None:
+        await LINK_INDEX.ensure_ready(self.ready_timeout)
+        if not LINK_INDEX.ready:
+            raise RuntimeError("no trusted source could be crawled")
+
+    async def run(self) -> None:
+        """Run every warm-up step; call once, as a background task."""
+        steps = {
+            # SDK import, model construction and the model endpoint's TLS handshake
+            "model": self.gemini.warm,
+            # First crawl of the trusted sites; also opens pooled connections to them
+            "link_index": self._link_index,
+            # Near-duplicate matching only sees verdicts in memory; seed it from the shared store
+            "verdicts": lambda: asyncio.to_thread(VERDICT_CACHE.warm),
+            "scam_rules": lambda: asyncio.to_thread(get_engine),
+        }
+        if PARSE_POOL.enabled:
+            steps["parse_pool"] = PARSE_POOL.warm
+        try:
+            await asyncio.gather(*(self._step(name, fn) for name, fn in steps.items()))
+        finally:
+            self.ready_after = round(time.monotonic() - self.started, 3)
+            self._done.set()
+
+    def skip(self) -> None:
+        """Report ready immediately (prewarm disabled)."""
+        self.ready_after = 0.0
+        self._done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "time_to_ready_seconds": self.ready_after,
+            "steps": dict(self.steps),
+            "step_seconds": dict(self.step_seconds),
+        }
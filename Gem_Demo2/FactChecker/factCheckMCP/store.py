@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import contextlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from settings import DATA_DIR
+
+# SQLite file shared by every worker process; empty disables the store
+STORE_PATH = os.getenv("FACTMCP_STORE_PATH", os.path.join(DATA_DIR, "factcheck_store.db"))
+STORE_MAX_BYTES = int(os.getenv("FACTMCP_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Expired and over-budget rows are pruned after this many writes
+_PRUNE_EVERY = 200
+_BATCH = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+"""
+
+
+class Store:
+    """Persistent key-value store shared by worker processes (SQLite, WAL).
+
+    Backs the in-memory page and verdict caches as a second layer, so a
+    restarted or newly spawned worker starts warm and every worker sees
+    what the others fetched and verified. Values are JSON, compressed with
+    zlib. Each row expires at a time set by the writer, and once the
+    stored bytes exceed `max_bytes` the oldest rows are dropped.
+
+    WAL mode lets readers proceed while another process writes. Reads are
+    one indexed lookup, made only on an in-memory miss; `aget` runs it on
+    a thread for callers on the event loop. Writes are queued as they
+    are and encoded, compressed and committed in batches by a background
+    thread, so a request neither spends time on zlib nor waits on another
+    process's write lock; values must not be changed once queued. Errors are
+    counted and otherwise ignored: a broken store degrades to a miss.
+    """
+
+    def __init__(self, path: str = STORE_PATH, max_bytes: int = STORE_MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._queue: "queue.Queue[Optional[Tuple[str, str, float, float, Dict[str, Any]]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._since_prune = 0
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+        self.pruned = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                # A directory that cannot be created fails the connect below, counted as an error
+                with contextlib.suppress(OSError):
+                    os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout = 10000")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, kind: str, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return (value, stored_at wall time) of an unexpired row, or None."""
+        if not self.enabled:
+            return None
+        self.reads += 1
+        try:
+            row = self._connect().execute(
+                "SELECT value, stored_at FROM entries WHERE kind = ? AND key = ? AND expires_at > ?",
+                (kind, key, time.time()),
+            ).fetchone()
+        except sqlite3.Error:
+            self.errors += 1
+            return None
+        if row is None:
+            return None
+        self.hits += 1
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    async def aget(self, kind: str, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """`get` without blocking the event loop."""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self.get, kind, key)
+
+    def recent(self, kind: str, limit: int) -> List[Tuple[Dict[str, Any], float]]:
+        """The newest `limit` unexpired values of `kind`, newest first."""
+        if not self.enabled:
+            return []
+        try:
+            rows = self._connect().execute(
+                "SELECT value, stored_at FROM entries WHERE kind = ? AND expires_at > ? "
+                "ORDER BY stored_at DESC LIMIT ?",
+                (kind, time.time(), limit),
+            ).fetchall()
+        except sqlite3.Error:
+            self.errors += 1
+            return []
+        return [(json.loads(zlib.decompress(value)), stored_at) for value, stored_at in rows]
+
+    def put(self, kind: str, key: str, value: Dict[str, Any], ttl: float, stored_at: Optional[float] = None) -> None:
+        """Queue a write; the row expires `ttl` seconds after `stored_at`."""
+        if not self.enabled or ttl <= 0:
+            return
+        stored_at = time.time() if stored_at is None else stored_at
+        self._ensure_writer()
+        self._queue.put((kind, key, stored_at, stored_at + ttl, value))
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            with self._start_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="factcheck-store", daemon=True)
+                    self._writer.start()
+                    # Commit what is still queued when the process exits
+                    atexit.register(self.close)
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < _BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
+            try:
+                if rows:
+                    self._write(rows)
+            except sqlite3.Error:
+                self.errors += 1
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if None in batch:
+                return
+
+    def _encode(self, rows: List[Tuple[str, str, float, float, Dict[str, Any]]]) -> List[Tuple[Any, ...]]:
+        encoded = []
+        for kind, key, stored_at, expires_at, value in rows:
+            try:
+                blob = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            except (TypeError, ValueError):
+                self.errors += 1
+                continue
+            if len(blob) <= self.max_bytes:
+                encoded.append((kind, key, stored_at, expires_at, len(blob), blob))
+        return encoded
+
+    def _write(self, rows: List[Tuple[str, str, float, float, Dict[str, Any]]]) -> None:
+        encoded = self._encode(rows)
+        if not encoded:
+            return
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (kind, key, stored_at, expires_at, size, value) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                encoded,
+            )
+        self.writes += len(encoded)
+        self._since_prune += len(encoded)
+        if self._since_prune >= _PRUNE_EVERY:
+            self._since_prune = 0
+            self.prune()
+
+    def prune(self) -> None:
+        """Drop expired rows, then the oldest rows until under `max_bytes`."""
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            removed = conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                # Free a tenth more than needed so every write does not trigger another pass
+                excess = total - int(self.max_bytes * 0.9)
+                doomed: List[Tuple[str, str]] = []
+                for kind, key, size in conn.execute("SELECT kind, key, size FROM entries ORDER BY stored_at"):
+                    doomed.append((kind, key))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", doomed)
+                removed += len(doomed)
+        self.pruned += removed
+        if removed:
+            conn.execute("PRAGMA incremental_vacuum")
+
+    def flush(self) -> None:
+        """Wait until every queued write is committed."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=10)
+            self._writer = None
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "path": self.path or None,
+            "max_bytes": self.max_bytes,
+            "reads": self.reads,
+            "hits": self.hits,
+            "writes": self.writes,
+            "pending_writes": self._queue.qsize(),
+            "pruned": self.pruned,
+            "errors": self.errors,
+        }
+        if self.enabled:
+            try:
+                out["rows"], out["bytes"] = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()
+            except sqlite3.Error:
+                self.errors += 1
+        return out
+
+
+STORE = Store()
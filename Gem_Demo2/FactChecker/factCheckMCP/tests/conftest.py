@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The modules are imported top-level, as main.py and the benchmarks do
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,38 @@
+import threading
+
+from capture import CaptureWriter, read_capture
+
+
+def test_records_are_written_by_the_writer_thread(tmp_path):
+    path = tmp_path / "data" / "capture.jsonl.gz"
+    writer = CaptureWriter(str(path), sample=1.0)
+    with writer.check("Free laptops for every student", "en", 2000) as check_id:
+        writer.record_model("prompt", "Free laptops for every student", "en", '{"label": "Fake"}', {"prompt_tokens": 3}, 0.1)
+    assert check_id is not None
+    assert writer._writer is not threading.current_thread()
+    writer.flush()
+    assert writer.records == 2
+    records = list(read_capture(str(path)))
+    assert [r["type"] for r in records] == ["check", "model"]
+    assert {r["id"] for r in records} == {check_id}
+    writer.close()
+
+
+def test_restart_appends_and_torn_tail_is_ignored(tmp_path):
+    path = str(tmp_path / "capture.jsonl.gz")
+    for n in range(2):
+        writer = CaptureWriter(path, sample=1.0)
+        with writer.check(f"claim {n}", None, None):
+            pass
+        writer.close()
+    with open(path, "ab") as fh:
+        fh.write(b"\x1f\x8b\x08\x00partial")
+    assert [r["content"] for r in read_capture(path)] == ["claim 0", "claim 1"]
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    writer = CaptureWriter(str(tmp_path / "capture.jsonl.gz"), sample=1.0, queue_size=1)
+    writer._writer = threading.Thread(target=lambda: None)  # no consumer
+    for n in range(3):
+        writer._write({"type": "check", "id": str(n)})
+    assert (writer.queued, writer.dropped) == (1, 2)
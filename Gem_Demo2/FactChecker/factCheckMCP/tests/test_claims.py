@@ -0,0 +1,74 @@
+from claims import combine, merge_sources, should_decompose, split_claims
+
+
+def _result(label, confidence=0.8, url=None, evidence=()):
+    return {
+        "analysis": {"label": label, "confidence": confidence, "explanation": f"{label} because", "evidence": list(evidence)},
+        "sources": [{"url": url}] if url else [],
+    }
+
+
+def test_split_keeps_dependent_sentences_with_their_claim():
+    text = (
+        "The RBI has banned all 500 rupee notes from next month. "
+        "It said the notes will be collected by banks. "
+        "Separately, petrol prices were cut by ten rupees across India."
+    )
+    assert split_claims(text) == [
+        "The RBI has banned all 500 rupee notes from next month. It said the notes will be collected by banks.",
+        "Separately, petrol prices were cut by ten rupees across India.",
+    ]
+
+
+def test_split_strips_bullets_and_drops_repeats():
+    text = "- Schools will stay closed until June 30 in Delhi\n2) Schools will stay closed until June 30 in Delhi!\n• Free gas cylinders are given to every family"
+    assert split_claims(text) == [
+        "Schools will stay closed until June 30 in Delhi",
+        "Free gas cylinders are given to every family",
+    ]
+
+
+def test_split_folds_claims_beyond_the_limit_into_the_last():
+    text = " ".join(f"Claim number {i} is about a different government scheme." for i in range(5))
+    claims = split_claims(text, max_claims=3)
+    assert len(claims) == 3
+    assert claims[2].startswith("Claim number 2") and claims[2].endswith("Claim number 4 is about a different government scheme.")
+
+
+def test_short_text_is_not_decomposed():
+    assert should_decompose("Free laptops for every student.") is None
+    assert split_claims("no sentence end") == ["no sentence end"]
+
+
+def test_combined_label_is_the_most_severe():
+    claims = ["a", "b", "c"]
+    results = [_result("Verified", 0.9), _result("Fake", 0.6), _result("Suspicious", 0.7)]
+    combined = combine(claims, results)
+    assert combined["label"] == "Fake"
+    assert combined["confidence"] == 0.6
+    assert combined["explanation"].startswith("3 claims checked separately: 1 verified, 1 suspicious, 1 fake.")
+    assert [c["label"] for c in combined["claims"]] == ["Verified", "Fake", "Suspicious"]
+
+    combined = combine(claims, [_result("Verified", 0.9), _result("Suspicious", 0.5), _result("Suspicious", 0.7)])
+    assert combined["label"] == "Suspicious"
+    assert combined["confidence"] == 0.6
+
+
+def test_unfinished_claims_do_not_count():
+    combined = combine(["a", "b"], [{"analysis": None}, _result("Verified", 0.8)])
+    assert combined["label"] == "Verified"
+    assert combined["claims"][0]["label"] is None
+
+    combined = combine(["a"], [{}])
+    assert "label" not in combined
+    assert combined["claims"][0]["claim"] == "a"
+
+
+def test_evidence_and_sources_are_merged_once():
+    quote = {"url": "https://pib.gov.in/a", "quote": "No such scheme"}
+    results = [
+        _result("Fake", url="https://pib.gov.in/a", evidence=[quote]),
+        _result("Fake", url="https://PIB.gov.in/a#top", evidence=[quote]),
+    ]
+    assert combine(["a", "b"], results)["evidence"] == [quote]
+    assert [s["url"] for s in merge_sources(results)] == ["https://pib.gov.in/a"]
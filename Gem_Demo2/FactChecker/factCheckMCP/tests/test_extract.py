@@ -0,0 +1,61 @@
+import pytest
+
+import extract
+from extract import extract_page
+
+BODY = (
+    "The health ministry said on Tuesday that the vaccination drive will be extended to all districts. "
+    "Officials added that supplies for the next quarter have already been delivered to the states."
+)
+MORE = "Doses for children under twelve will be available at primary health centres from next month onwards."
+
+
+@pytest.fixture(params=["lxml", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(extract, "etree", None)
+    elif extract.etree is None:
+        pytest.skip("lxml not installed")
+    return request.param
+
+
+def _extract(html: str) -> dict:
+    return extract_page(html.encode("utf-8"), "https://example.org/a", 40000)
+
+
+def test_div_only_article_keeps_body(backend):
+    page = _extract(
+        "<html><head><title>Drive extended</title></head><body>"
+        "<article><header><h1>Vaccination drive extended to all districts</h1></header>"
+        f'<div class="content">{BODY}</div></article></body></html>'
+    )
+    assert "Vaccination drive extended to all districts" in page["text"]
+    assert BODY in page["text"]
+
+
+def test_div_only_page_without_article(backend):
+    page = _extract(f"<html><body><div><div>{BODY}</div><div>{MORE}</div></div></body></html>")
+    assert page["text"].splitlines() == [BODY, MORE]
+
+
+def test_page_header_outside_article_is_dropped(backend):
+    page = _extract(
+        "<html><body><header><h1>Site name and tagline for every page</h1></header>"
+        f"<article><h1>Vaccination drive extended</h1><p>{BODY}</p></article>"
+        "<footer><p>Copyright notice and all the usual legal small print</p></footer></body></html>"
+    )
+    assert page["text"].splitlines() == ["Vaccination drive extended", BODY]
+
+
+def test_loose_text_ignored_when_blocks_suffice(backend):
+    page = _extract(
+        "<html><body><div>Trending now: cricket scores and weather updates today</div>"
+        f"<article><p>{BODY}</p><p>{MORE}</p></article></body></html>"
+    )
+    assert page["text"].splitlines() == [BODY, MORE]
+
+
+def test_link_list_divs_are_not_fallback_text(backend):
+    links = "".join(f'<a href="/{i}">Another related story number {i}</a> ' for i in range(10))
+    page = _extract(f"<html><body><div>{links}</div><div>{BODY}</div></body></html>")
+    assert page["text"] == BODY
@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+
+import sources
+from http_client import set_transport
+from page_cache import PageCache
+
+HTML = b"<html><head><title>Notice</title></head><body><p>" + b"The circular was issued on Monday by the ministry. " * 4 + b"</p></body></html>"
+
+
+def _page(url, chars=40):
+    return {"url": url, "title": "t", "text": "x" * chars}
+
+
+def test_fresh_entry_is_served_until_ttl_then_revalidated():
+    cache = PageCache(ttl=60, backing_store=None)
+    cache.store("a", _page("a"), 1000, {"etag": '"v1"', "last-modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, 500)
+    page, headers = cache.lookup("a", 1000)
+    assert page["url"] == "a" and headers == {}
+    assert (cache.hits, cache.bytes_saved) == (1, 500)
+
+    cache._entries["a"].stored_at -= 61
+    page, headers = cache.lookup("a", 1000)
+    assert page is None
+    assert headers == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert cache.revalidations == 1
+
+
+def test_stale_entry_without_validators_is_a_miss():
+    cache = PageCache(ttl=0, backing_store=None)
+    cache.store("a", _page("a"), 1000, {}, 500)
+    assert cache.lookup("a", 1000) == (None, {})
+    assert cache.misses == 1
+
+
+def test_entry_extracted_with_fewer_chars_is_a_miss():
+    cache = PageCache(backing_store=None)
+    cache.store("a", _page("a"), 100, {}, 500)
+    assert cache.lookup("a", 200) == (None, {})
+    page, _ = cache.lookup("a", 50)
+    assert page is not None
+
+
+def test_least_recently_used_entries_are_evicted_by_size():
+    # Each page counts 42 characters (url, title and text), so three fit in 130
+    cache = PageCache(max_bytes=130, backing_store=None)
+    for key in "abc":
+        cache.store(key, _page(key), 1000, {}, 10)
+    cache.lookup("a", 1000)  # a is now the most recently used
+    cache.store("d", _page("d"), 1000, {}, 10)
+    assert list(cache._entries) == ["c", "a", "d"]
+    assert cache.evictions == 1
+    assert cache.stats()["bytes"] <= 130
+
+    cache.store("huge", _page("huge", 500), 1000, {}, 10)
+    assert "huge" not in cache._entries
+
+
+def test_304_refreshes_the_entry_without_refetching(monkeypatch):
+    cache = PageCache(ttl=60, backing_store=None)
+    monkeypatch.setattr(sources, "PAGE_CACHE", cache)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, headers={"content-type": "text/html", "etag": '"v1"'}, content=HTML)
+
+    async def run():
+        first = await sources._fetch_page_async("https://example.gov.in/notice", 1000)
+        cache._entries["https://example.gov.in/notice"].stored_at -= 61
+        second = await sources._fetch_page_async("https://example.gov.in/notice", 1000)
+        third = await sources._fetch_page_async("https://example.gov.in/notice", 1000)
+        return first, second, third
+
+    set_transport(httpx.MockTransport(handler))
+    try:
+        first, second, third = asyncio.run(run())
+    finally:
+        set_transport(None)
+    assert [outcome for _, outcome in (first, second, third)] == ["fetched", "not_modified", "cached"]
+    assert first[0] == second[0] == third[0]
+    assert "circular was issued" in first[0]["text"]
+    assert len(requests) == 2
+    assert cache.not_modified == 1
@@ -0,0 +1,44 @@
+from parse_pool import BUFFERED_TEXT_SLACK, ParsePool, StreamingExtractor, _visible_chars
+
+PARAGRAPH = "<div><p>" + "Officials confirmed the report after a long review of the records. " * 3 + "</p></div>\n"
+
+
+def _page(head_bytes: int, paragraphs: int) -> bytes:
+    style = "a{b:c}" * (head_bytes // 6)
+    body = "".join(PARAGRAPH.replace("review", f"review {i}") for i in range(paragraphs))
+    return f"<html><head><style>{style}</style></head><body>{body}</body></html>".encode()
+
+
+def _stream(extractor: StreamingExtractor, html: bytes, chunk: int = 8192) -> None:
+    for i in range(0, len(html), chunk):
+        extractor.feed(html[i:i + chunk])
+        if extractor.done:
+            return
+
+
+def test_visible_chars_carries_unfinished_markup():
+    assert _visible_chars("<p>hello world</p>") == (10, "")
+    assert _visible_chars("ab<script>var x = '<b>'") == (2, "<script>var x = '<b>'")
+    assert _visible_chars("x <div cla") == (1, "<div cla")
+
+
+def test_buffered_body_stops_once_enough_text_arrived():
+    # No worker is started: only feed() runs, which buffers without parsing
+    pool = ParsePool(workers=1, inline_bytes=64 * 1024)
+    html = _page(head_bytes=100_000, paragraphs=20_000)
+    extractor = StreamingExtractor("https://example.com/a", 2000, pool=pool)
+    _stream(extractor, html)
+    assert extractor._inline is None
+    assert extractor.done
+    assert extractor.received < 400_000 < pool.max_task_bytes
+    assert extractor._text_estimate >= BUFFERED_TEXT_SLACK * 2000
+
+
+def test_script_split_across_chunks_is_not_counted():
+    pool = ParsePool(workers=1, inline_bytes=1024)
+    script = "<script>" + "var text = 'not visible at all';" * 20_000 + "</script>"
+    html = f"<html><head>{'<meta>' * 200}{script}</head><body><p>short</p></body></html>".encode()
+    extractor = StreamingExtractor("https://example.com/b", 2000, pool=pool)
+    _stream(extractor, html, chunk=4096)
+    assert not extractor.done
+    assert extractor._text_estimate < 10
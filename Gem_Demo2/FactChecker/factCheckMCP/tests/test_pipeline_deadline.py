@@ -0,0 +1,86 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pipeline
+from deadline import Deadline
+from pipeline import CheckPipeline
+from verdict_cache import VerdictCache
+
+CLAIM = "The state government has announced free electricity for all farmers from April"
+HITS = [{"url": f"https://example.gov.in/{i}", "title": f"Notice {i}"} for i in range(3)]
+
+
+class _Model:
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    async def analyze_content_with_usage_async(self, content, evidence, language_hint=None, timeout=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"label": "Fake", "confidence": 0.8, "explanation": "No such notice"}, {"prompt_tokens": 10}
+
+
+def _setup(monkeypatch, slow_page):
+    async def search(content, limit, timeout):
+        return HITS
+
+    async def fetch_many(urls):
+        # The first page arrives at once; with slow_page the rest never do
+        yield {"index": 0, "page": {"url": urls[0], "title": "Notice 0", "text": CLAIM}}
+        if slow_page:
+            await asyncio.sleep(60)
+        for i, url in enumerate(urls[1:], 1):
+            yield {"index": i, "page": {"url": url, "title": f"Notice {i}", "text": CLAIM}}
+
+    monkeypatch.setattr(pipeline, "search", search)
+    monkeypatch.setattr(pipeline, "fetch_many", fetch_many)
+    monkeypatch.setattr(pipeline, "LINK_INDEX", SimpleNamespace(ready=True))
+
+
+def test_check_past_its_deadline_answers_partially_and_is_not_cached(monkeypatch):
+    _setup(monkeypatch, slow_page=True)
+    verdicts = VerdictCache(backing_store=None)
+    model = _Model(delay=60)
+    checker = CheckPipeline(model, verdicts=verdicts)
+
+    started = time.monotonic()
+    result = asyncio.run(checker.run(CLAIM, deadline=Deadline(1.0)))
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.5
+    assert result["partial"] is True
+    assert result["incomplete"] == ["fetch", "analysis"]
+    assert result["analysis"] == {}
+    # Pages that arrived in time are still returned
+    assert [s["url"] for s in result["sources"]] == [HITS[0]["url"]]
+    assert model.calls == 1
+    assert not verdicts._entries
+
+
+def test_check_within_its_deadline_is_complete_and_cached(monkeypatch):
+    _setup(monkeypatch, slow_page=False)
+    verdicts = VerdictCache(backing_store=None)
+    checker = CheckPipeline(_Model(delay=0.01), verdicts=verdicts)
+
+    result = asyncio.run(checker.run(CLAIM, deadline=Deadline(5.0)))
+
+    assert result["partial"] is False
+    assert result["incomplete"] == []
+    assert result["analysis"]["label"] == "Fake"
+    assert len(result["sources"]) == 3
+    assert verdicts.get(CLAIM)["cache"]["layer"] == "exact"
+
+
+def test_model_cut_short_leaves_only_analysis_incomplete(monkeypatch):
+    _setup(monkeypatch, slow_page=False)
+    verdicts = VerdictCache(backing_store=None)
+    checker = CheckPipeline(_Model(delay=60), verdicts=verdicts)
+
+    result = asyncio.run(checker.run(CLAIM, deadline=Deadline(0.8)))
+
+    assert result["partial"] is True
+    assert result["incomplete"] == ["analysis"]
+    assert len(result["sources"]) == 3
+    assert not verdicts._entries
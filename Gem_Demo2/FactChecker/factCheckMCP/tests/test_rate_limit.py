@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import pytest
+
+from rate_limit import RateLimiter, RateLimitTimeout
+
+
+def test_cancelled_waiters_leave_the_queue():
+    async def run():
+        limiter = RateLimiter(rpm=1, tpm=1_000_000)
+        await limiter.acquire(10)
+        # The bucket is empty now: these wait about a minute each
+        waiters = [asyncio.create_task(limiter.acquire(10)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        assert limiter.waiting == 5
+        for task in waiters:
+            task.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        assert limiter.waiting == 0
+        assert not limiter._queue.locked()
+
+    asyncio.run(run())
+
+
+def test_outer_timeout_releases_waiting_count():
+    async def run():
+        limiter = RateLimiter(rpm=1, tpm=1_000_000)
+        await limiter.acquire(10)
+        with pytest.raises(TimeoutError):
+            # Like pipeline._verify: the outer budget fires before the limiter gives up
+            async with asyncio.timeout(0.05):
+                await limiter.acquire(10)
+        assert limiter.waiting == 0
+
+    asyncio.run(run())
+
+
+def test_deadline_raises_rate_limit_timeout():
+    async def run():
+        limiter = RateLimiter(rpm=1, tpm=1_000_000)
+        await limiter.acquire(10)
+        with pytest.raises(RateLimitTimeout):
+            await limiter.acquire(10, deadline=time.monotonic() + 0.05)
+        assert limiter.waiting == 0
+        assert limiter.timeouts == 1
+
+    asyncio.run(run())
@@ -0,0 +1,95 @@
+import re
+
+import pytest
+
+from scam_engine import ScamEngine, get_engine
+
+# detect_scam before the rules file: flag on any match of these
+BASELINE_PATTERNS = [
+    r"free\s*lottery|won\s*prize",
+    r"update\s*KYC|block\s*account",
+    r"OTP\s*sharing",
+    r"90%\s*returns|double\s*investment",
+    r"urgent\s*payment|UPI\s*transfer",
+]
+
+
+def _baseline(text):
+    return [p for p in BASELINE_PATTERNS if re.search(p, text, re.IGNORECASE)]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Get your freelottery ticket today",
+        "You WON PRIZE of 25 lakh",
+        "Please updateKYC to continue",
+        "We will block   account tonight",
+        "otp sharing is required for the refund",
+        "Guaranteed 90%returns in a week",
+        "Double investment scheme, join now",
+        "urgent payment needed via UPI transfer",
+    ],
+)
+def test_baseline_matches_still_flag(text):
+    assert _baseline(text)
+    assert get_engine().scan(text)["is_suspicious"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "The finance ministry released the budget today",
+        "Free public transport starts in Delhi next month",
+    ],
+)
+def test_clean_text_is_not_flagged(text):
+    result = get_engine().scan(text)
+    assert not _baseline(text)
+    assert not result["is_suspicious"]
+    assert result["matched"] == []
+
+
+def test_weak_rule_alone_does_not_flag():
+    result = get_engine().scan("Pay to ramesh@ybl for the concert tickets")
+    assert result["matched"] == ["upi.handle"]
+    assert result["score"] == 0.3
+    assert not result["is_suspicious"]
+
+
+def test_category_and_overall_scores_combine_weights():
+    engine = ScamEngine(
+        [
+            {"id": "a", "category": "x", "weight": 0.5, "phrases": ["alpha"]},
+            {"id": "b", "category": "x", "weight": 0.5, "phrases": ["beta"]},
+            {"id": "c", "category": "y", "weight": 0.2, "regex": r"gamma\d+"},
+        ]
+    )
+    result = engine.scan("alpha beta gamma42, alpha again")
+    assert result["categories"] == {"x": 0.75, "y": 0.2}
+    # 1 - (1 - 0.75) * (1 - 0.2)
+    assert result["score"] == 0.8
+    assert result["matched"] == ["a", "b", "c"]
+
+
+def test_spans_point_at_the_matched_text():
+    text = "Dear user, UPDATE   KYC now or we block account"
+    spans = get_engine().scan(text)["spans"]
+    assert [(s["rule"], text[s["start"]:s["end"]]) for s in spans] == [
+        ("kyc.update", "UPDATE   KYC"),
+        ("kyc.account_block", "block account"),
+    ]
+    assert all(s["text"] == text[s["start"]:s["end"]] for s in spans)
+
+
+def test_overlapping_regex_rules_are_all_reported():
+    text = "Install from bit.ly/app.apk today"
+    spans = get_engine().scan(text)["spans"]
+    found = {(s["rule"], s["text"]) for s in spans}
+    assert ("link.shortener", "bit.ly/app") in found
+    assert ("link.apk", "bit.ly/app.apk") in found
+
+
+def test_phrase_and_regex_of_one_rule_report_one_span():
+    spans = get_engine().scan("free lottery")["spans"]
+    assert [(s["rule"], s["start"], s["end"]) for s in spans] == [("lottery.prize_won", 0, 12)]
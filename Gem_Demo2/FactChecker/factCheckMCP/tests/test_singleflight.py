@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    async def run():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "done"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        assert results == ["done"] * 5
+        assert calls == 1
+        assert (flight.leaders, flight.coalesced) == (1, 4)
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_failure_reaches_every_waiter_and_key_is_forgotten():
+    async def run():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.failures == 1
+        assert flight.stats()["in_flight"] == 0
+
+        async def ok():
+            return 42
+
+        # The next call after a failure starts afresh
+        assert await flight.do("k", ok) == 42
+        assert flight.leaders == 2
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_shared_task_running():
+    async def run():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        shared = flight._calls["k"].task
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await asyncio.sleep(0)
+        assert not shared.cancelled()
+        assert flight._calls["k"].waiters == 1
+        release.set()
+        assert await second == "done"
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_last_cancelled_waiter_cancels_shared_task():
+    async def run():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(60)
+
+        waiters = [asyncio.create_task(flight.do("k", work)) for _ in range(3)]
+        await started.wait()
+        shared = flight._calls["k"].task
+        for task in waiters:
+            task.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert shared.cancelled()
+        assert flight.stats()["in_flight"] == 0
+        assert flight.failures == 0
+
+    asyncio.run(run())
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import time
+
+from store import Store
+
+
+def _store(tmp_path, **kwargs):
+    return Store(str(tmp_path / "data" / "store.db"), **kwargs)
+
+
+def test_put_then_get_round_trips_through_the_writer(tmp_path):
+    store = _store(tmp_path)
+    store.put("page", "a", {"text": "hello", "n": 1}, ttl=60, stored_at=1000.0 + time.time())
+    store.flush()
+    value, stored_at = store.get("page", "a")
+    assert value == {"text": "hello", "n": 1}
+    assert stored_at > time.time()
+    assert store.get("verdict", "a") is None
+    assert asyncio.run(store.aget("page", "a"))[0] == value
+    # The data directory is created on first use
+    assert os.path.isdir(tmp_path / "data")
+    store.close()
+
+
+def test_expired_rows_are_not_returned(tmp_path):
+    store = _store(tmp_path)
+    store.put("page", "old", {"v": 1}, ttl=10, stored_at=time.time() - 20)
+    store.put("page", "new", {"v": 2}, ttl=10)
+    store.flush()
+    assert store.get("page", "old") is None
+    assert [v for v, _ in store.recent("page", 10)] == [{"v": 2}]
+    store.close()
+
+
+def test_prune_drops_expired_then_oldest_rows_under_max_bytes(tmp_path):
+    store = _store(tmp_path, max_bytes=10_000)
+    now = time.time()
+    store.put("page", "expired", {"v": "x"}, ttl=1, stored_at=now - 5)
+    for i in range(40):
+        # Hex digits of random bytes compress to about half, so each row is about 500 bytes
+        store.put("page", f"k{i}", {"v": os.urandom(500).hex()}, ttl=3600, stored_at=now + i)
+    store.flush()
+    store.prune()
+    stats = store.stats()
+    assert stats["bytes"] <= 10_000 * 0.9
+    assert store.get("page", "expired") is None
+    kept = {key for key in (f"k{i}" for i in range(40)) if store.get("page", key) is not None}
+    # The newest rows survive
+    assert kept == {f"k{i}" for i in range(40 - len(kept), 40)}
+    assert 0 < len(kept) < 40
+    assert store.pruned == 41 - len(kept)
+    store.close()
+
+
+def test_values_are_encoded_by_the_writer(tmp_path):
+    store = _store(tmp_path, max_bytes=1_000)
+    store.put("page", "bad", {"v": object()}, ttl=60)
+    store.put("page", "huge", {"v": os.urandom(2_000).hex()}, ttl=60)
+    store.put("page", "ok", {"v": 1}, ttl=60)
+    store.flush()
+    assert store.errors == 1
+    assert store.get("page", "bad") is None
+    assert store.get("page", "huge") is None
+    assert store.get("page", "ok")[0] == {"v": 1}
+    assert store.writes == 1
+    store.close()
+
+
+def test_disabled_store_is_a_no_op():
+    store = Store("")
+    store.put("page", "a", {"v": 1}, ttl=60)
+    assert store.get("page", "a") is None
+    assert asyncio.run(store.aget("page", "a")) is None
+    assert store.recent("page", 10) == []
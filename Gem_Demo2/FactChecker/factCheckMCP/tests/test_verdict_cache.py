@@ -0,0 +1,73 @@
+from verdict_cache import VerdictCache, canonicalize, claim_key
+
+CLAIM = "The government will give every student a free laptop under the new scheme announced in March 2024"
+ANALYSIS = {"label": "Fake", "confidence": 0.9}
+SOURCES = [{"url": "https://pib.gov.in/x", "title": "PIB"}]
+
+
+def _cache(**kwargs):
+    return VerdictCache(backing_store=None, **kwargs)
+
+
+def test_canonicalization_makes_trivial_edits_exact_hits():
+    cache = _cache()
+    cache.put(CLAIM, None, ANALYSIS, SOURCES)
+    assert canonicalize("  FREE laptop!!! 🎉 ") == "free laptop"
+    hit = cache.get("THE government will give every student a free laptop, under the new scheme announced in March 2024!!")
+    assert hit["cache"]["layer"] == "exact"
+    assert hit["analysis"] == ANALYSIS
+
+
+def test_edited_forward_is_a_near_hit():
+    cache = _cache()
+    cache.put(CLAIM, None, ANALYSIS, SOURCES)
+    hit = cache.get(CLAIM.replace("March 2024", "March 2025"))
+    assert hit is not None
+    assert hit["cache"]["layer"] == "near"
+    # An estimate over 64 permutations, so a one-word edit can still read as 1.0
+    assert hit["cache"]["similarity"] >= 0.75
+    assert cache.near_hits == 1
+
+
+def test_unrelated_claim_misses():
+    cache = _cache()
+    cache.put(CLAIM, None, ANALYSIS, SOURCES)
+    assert cache.get("Drinking hot water with lemon every morning cures all kinds of cancer in two weeks") is None
+    assert cache.misses == 1
+
+
+def test_near_match_is_language_specific():
+    cache = _cache()
+    cache.put(CLAIM, "en", ANALYSIS, SOURCES)
+    assert cache.get(CLAIM.replace("2024", "2025"), "hi") is None
+    assert cache.get(CLAIM.replace("2024", "2025"), "en") is not None
+
+
+def test_claims_under_40_chars_only_match_exactly():
+    cache = _cache()
+    short = "Free laptops for all students in 2024"
+    assert len(canonicalize(short)) < 40
+    cache.put(short, None, ANALYSIS, SOURCES)
+    assert cache._entries[next(iter(cache._entries))].signature is None
+    assert cache.get(short.replace("2024", "2025")) is None
+    assert cache.get(short.upper())["cache"]["layer"] == "exact"
+
+
+def test_expired_entries_are_dropped():
+    cache = _cache(ttl=60)
+    cache.put(CLAIM, None, ANALYSIS, SOURCES)
+    entry = next(iter(cache._entries.values()))
+    entry.created_at -= 61
+    assert cache.get(CLAIM) is None
+    assert not cache._entries
+    assert not cache._buckets
+
+
+def test_least_recently_used_verdict_is_evicted():
+    cache = _cache(max_entries=2)
+    claims = [f"Claim number {i} about the railway budget for the coming financial year" for i in range(3)]
+    cache.put(claims[0], None, ANALYSIS, SOURCES)
+    cache.put(claims[1], None, ANALYSIS, SOURCES)
+    assert cache.get(claims[0])["cache"]["layer"] == "exact"
+    cache.put(claims[2], None, ANALYSIS, SOURCES)
+    assert list(cache._entries) == [claim_key(claims[0]), claim_key(claims[2])]
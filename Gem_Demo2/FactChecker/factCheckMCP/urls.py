@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Optional
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(href: str, base: Optional[str] = None) -> Optional[str]:
+    """Resolve `href` against `base` and return a canonical absolute URL.
+
+    Scheme and host are lower-cased, default ports and fragments dropped.
+    Returns None for anything that is not an http(s) URL (mailto:, javascript:, ...).
+    """
+    href = href.strip()
+    if base:
+        href = urljoin(base, href)
+    href, _ = urldefrag(href)
+    try:
+        parts = urlsplit(href)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if port and port != _DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
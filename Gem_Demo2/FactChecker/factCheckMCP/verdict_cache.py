@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from store import STORE, Store
+
+VERDICT_CACHE_TTL = float(os.getenv("FACTMCP_VERDICT_CACHE_TTL", "21600"))
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("FACTMCP_VERDICT_CACHE_MAX_ENTRIES", "10000"))
+# Minimum estimated Jaccard similarity of character shingles for a near-duplicate match
+VERDICT_CACHE_SIMILARITY = float(os.getenv("FACTMCP_VERDICT_CACHE_SIMILARITY", "0.75"))
+
+_SHINGLE = 5
+_NUM_PERM = 64
+_BAND_ROWS = 4
+# Shorter claims are only matched exactly; a few edited characters swing their similarity too far
+_MIN_NEAR_CHARS = 40
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(_NUM_PERM)]
+
+
+def canonicalize(text: str) -> str:
+    """Fold case, drop punctuation/emoji/symbols and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    kept = [" " if unicodedata.category(ch)[0] in "PSZC" else ch for ch in text]
+    return re.sub(r"\s+", " ", "".join(kept)).strip()
+
+
+def _hash_key(canonical: str, language_hint: Optional[str]) -> str:
+    return hashlib.sha256(f"{language_hint or 'auto'}\x00{canonical}".encode("utf-8")).hexdigest()
+
+
+def claim_key(content: str, language_hint: Optional[str] = None) -> str:
+    """Stable key for a claim: identical after canonicalization → same key."""
+    return _hash_key(canonicalize(content), language_hint)
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """MinHash signature over the character shingles of `text`."""
+    hashes = {
+        int.from_bytes(hashlib.blake2b(text[i:i + _SHINGLE].encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(len(text) - _SHINGLE + 1)
+    }
+    return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMS)
+
+
+def _similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / _NUM_PERM
+
+
+@dataclass
+class _Verdict:
+    key: str
+    language: str
+    signature: Optional[Tuple[int, ...]]
+    analysis: Dict[str, Any]
+    sources: List[Dict[str, Any]]
+    created_at: float
+    elapsed: float
+
+
+class VerdictCache:
+    """Two-layer cache of completed verdicts in front of the model call.
+
+    The exact layer is keyed by a hash of the canonicalized claim (case,
+    punctuation, emoji and whitespace folded away). The near-duplicate
+    layer compares MinHash signatures over character shingles, so a
+    forward with an edited number or date still matches when its estimated
+    Jaccard similarity is at least `similarity`. Candidates come from LSH
+    buckets (bands of 4 signature rows) and are then checked against the
+    threshold.
+
+    Entries expire after `ttl` seconds; the least recently used entry is
+    dropped once `max_entries` is reached.
+
+    Verdicts are also written to the persistent `backing_store`, shared
+    with other workers and kept across restarts. An exact-layer miss
+    falls through to it; near-duplicate matching only sees the verdicts
+    held in memory, which `warm` preloads from the store at startup.
+    Callers on the event loop use `aget`, which makes the store read on
+    a thread.
+    """
+
+    def __init__(
+        self,
+        ttl: float = VERDICT_CACHE_TTL,
+        max_entries: int = VERDICT_CACHE_MAX_ENTRIES,
+        similarity: float = VERDICT_CACHE_SIMILARITY,
+        backing_store: Optional[Store] = STORE,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.backing_store = backing_store
+        self._entries: "OrderedDict[str, _Verdict]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.latency_saved = 0.0
+
+    @staticmethod
+    def _band_keys(sig: Tuple[int, ...]) -> List[Tuple[int, int]]:
+        return [
+            (i, hash(sig[i:i + _BAND_ROWS])) for i in range(0, _NUM_PERM, _BAND_ROWS)
+        ]
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry.signature is not None:
+            for band in self._band_keys(entry.signature):
+                bucket = self._buckets.get(band)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band]
+
+    @staticmethod
+    def _signature(canonical: str) -> Optional[Tuple[int, ...]]:
+        return minhash(canonical) if len(canonical) >= _MIN_NEAR_CHARS else None
+
+    def _hit(self, entry: _Verdict, layer: str, similarity: float) -> Dict[str, Any]:
+        self._entries.move_to_end(entry.key)
+        self.latency_saved += entry.elapsed
+        return {
+            "analysis": entry.analysis,
+            "sources": entry.sources,
+            "cache": {
+                "hit": True,
+                "layer": layer,
+                "similarity": round(similarity, 3),
+                "age_seconds": round(time.time() - entry.created_at, 1),
+            },
+        }
+
+    def get(self, content: str, language_hint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        canonical = canonicalize(content)
+        key = _hash_key(canonical, language_hint)
+        now = time.time()
+        hit = self._exact(key, now)
+        if hit is not None:
+            return hit
+        # Outside the lock: the store read may touch disk
+        stored = self._load(key, now, self.backing_store.get("verdict", key) if self._stored else None)
+        return self._match(canonical, key, language_hint, now, stored)
+
+    async def aget(self, content: str, language_hint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """`get` without blocking the event loop on the store read."""
+        canonical = canonicalize(content)
+        key = _hash_key(canonical, language_hint)
+        now = time.time()
+        hit = self._exact(key, now)
+        if hit is not None:
+            return hit
+        stored = self._load(key, now, await self.backing_store.aget("verdict", key) if self._stored else None)
+        return self._match(canonical, key, language_hint, now, stored)
+
+    @property
+    def _stored(self) -> bool:
+        return self.backing_store is not None and self.ttl > 0
+
+    def _exact(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.created_at < self.ttl:
+                    self.exact_hits += 1
+                    return self._hit(entry, "exact", 1.0)
+                self._drop(key)
+        return None
+
+    def _match(
+        self,
+        canonical: str,
+        key: str,
+        language_hint: Optional[str],
+        now: float,
+        stored: Optional[_Verdict],
+    ) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if stored is not None:
+                self._insert(stored)
+                self.exact_hits += 1
+                self.store_hits += 1
+                return self._hit(stored, "exact", 1.0)
+
+            sig = self._signature(canonical)
+            if sig is not None:
+                best: Optional[_Verdict] = None
+                best_similarity = self.similarity
+                candidates: Set[str] = set()
+                for band in self._band_keys(sig):
+                    candidates.update(self._buckets.get(band, ()))
+                for cand_key in candidates:
+                    cand = self._entries.get(cand_key)
+                    if cand is None:
+                        continue
+                    if now - cand.created_at >= self.ttl:
+                        continue
+                    # Verdicts are language specific, as in the exact key
+                    if cand.language != (language_hint or "auto"):
+                        continue
+                    similarity = _similarity(cand.signature, sig)
+                    if similarity >= best_similarity:
+                        best, best_similarity = cand, similarity
+                if best is not None:
+                    self.near_hits += 1
+                    return self._hit(best, "near", best_similarity)
+            self.misses += 1
+            return None
+
+    @staticmethod
+    def _from_value(key: str, value: Dict[str, Any], created_at: float) -> _Verdict:
+        signature = value.get("signature")
+        return _Verdict(
+            key=key,
+            language=value["language"],
+            signature=tuple(signature) if signature else None,
+            analysis=value["analysis"],
+            sources=value["sources"],
+            created_at=created_at,
+            elapsed=value.get("elapsed", 0.0),
+        )
+
+    def _load(self, key: str, now: float, found: Optional[Tuple[Dict[str, Any], float]]) -> Optional[_Verdict]:
+        if found is None or now - found[1] >= self.ttl:
+            return None
+        return self._from_value(key, found[0], found[1])
+
+    def _insert(self, entry: _Verdict) -> None:
+        # Called with the lock held
+        self._drop(entry.key)
+        self._entries[entry.key] = entry
+        if entry.signature is not None:
+            for band in self._band_keys(entry.signature):
+                self._buckets.setdefault(band, set()).add(entry.key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def warm(self, limit: Optional[int] = None) -> int:
+        """Preload the newest stored verdicts; returns how many were loaded.
+
+        Reads the store synchronously; run it on a thread from the event loop.
+        """
+        if not self._stored:
+            return 0
+        rows = self.backing_store.recent("verdict", limit or self.max_entries)
+        now = time.time()
+        loaded = 0
+        with self._lock:
+            # Oldest first, so the newest end up most recently used
+            for value, created_at in reversed(rows):
+                if now - created_at >= self.ttl or value["key"] in self._entries:
+                    continue
+                self._insert(self._from_value(value["key"], value, created_at))
+                loaded += 1
+        return loaded
+
+    def put(
+        self,
+        content: str,
+        language_hint: Optional[str],
+        analysis: Dict[str, Any],
+        sources: List[Dict[str, Any]],
+        elapsed: float = 0.0,
+    ) -> None:
+        canonical = canonicalize(content)
+        key = _hash_key(canonical, language_hint)
+        entry = _Verdict(
+            key=key,
+            language=language_hint or "auto",
+            signature=self._signature(canonical),
+            analysis=analysis,
+            sources=sources,
+            created_at=time.time(),
+            elapsed=elapsed,
+        )
+        with self._lock:
+            self._insert(entry)
+        if self.backing_store is not None:
+            value = {
+                "key": key,
+                "language": entry.language,
+                "signature": list(entry.signature) if entry.signature is not None else None,
+                "analysis": analysis,
+                "sources": sources,
+                "elapsed": elapsed,
+            }
+            self.backing_store.put("verdict", key, value, self.ttl, entry.created_at)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.exact_hits + self.near_hits) / lookups, 3) if lookups else 0.0,
+                "model_calls_saved": self.exact_hits + self.near_hits,
+                "store_hits": self.store_hits,
+                "latency_saved_seconds": round(self.latency_saved, 3),
+            }
+
+
+VERDICT_CACHE = VerdictCache()